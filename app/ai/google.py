@@ -1,13 +1,12 @@
 import logging
 import os
-from typing import Optional, Tuple
+from datetime import datetime, timedelta
 
 from dotenv import load_dotenv
-from google import genai
-from PIL import Image
 from sqlalchemy import select
 
-from app.database import SessionLocal
+from app.ai.rewriter import get_genai_client, get_rewriter
+from app.config import settings
 from app.models import NewsItem
 
 load_dotenv()
@@ -21,7 +20,7 @@ def generate_image(text: str) -> str:
     """
     Метод для генерации изображения для новости Телеграмма по ее тексту
     """
-    client = genai.Client()
+    client = get_genai_client()
 
     prompt = f"Generate image for social network for news: {text}"
     logger.info("Generating image for news")
@@ -44,83 +43,28 @@ def generate_image(text: str) -> str:
 
 def rewrite_news(text: str) -> str:
     """
-    Метод переформулирует оригинальную новость при помощи нейросети от google
+    Метод переформулирует оригинальную новость при помощи нейросети от google.
+    Результат кэшируется, клиент переиспользуется (см. app.ai.rewriter).
     """
 
-    client = genai.Client()
+    return get_rewriter().rewrite(text)
 
-    prompt = f"""
-Ты редактор новостей.
-
-Перепиши новость для Telegram:
-— коротко
-— живо
-— 1–2 абзаца
-— без клише
-- без разметки markdown
-
-Текст:
-{text}
-"""
-
-    logger.info("Rewriting news text")
-
-    response = client.models.generate_content(
-        model="gemini-3-flash-preview",
-        contents=prompt,
-    )
-
-    logger.debug("Original text: %s", text)
-    logger.debug("Model response: %s", response)
-
-    return response.text.strip()
-
-
-def take_last_post_and_rewrite(
-    limit: int = 1,
-) -> Optional[Tuple[int, str]]:
 
+def select_next_news(limit: int = 1):
     """
-    Берем из БД новость, которая не отправлась как пост ранее (status == NULL)
-    и является тематически релевантной нашему каналу is_relevant == True,
-    переписываем ее при помощи нейросети и формируем текст для поста в Телеграмм.
+    Запрос следующих новостей для публикации: свежие первыми.
+    Условие совпадает с частичным индексом ix_news_pending_published_at.
     """
 
-    session = SessionLocal()
-
-    try:
-        logger.info("Fetching last relevant news item")
+    cutoff = datetime.utcnow() - timedelta(hours=settings.post_max_age_hours)
 
-        stmt = (
-            select(NewsItem)
-            .where(
-                NewsItem.is_relevant.is_(True),
-                NewsItem.status.is_(None),
-            )
-            .limit(limit)
+    return (
+        select(NewsItem)
+        .where(
+            NewsItem.is_relevant.is_(True),
+            NewsItem.status.is_(None),
+            NewsItem.published_at >= cutoff,
         )
-
-        news_item = session.scalars(stmt).first()
-
-        if not news_item:
-            logger.info("No relevant news items found")
-            return None
-
-        logger.info(
-            "Rewriting news item id=%s title=%s",
-            news_item.id,
-            news_item.title,
-        )
-
-        rewritten_text = rewrite_news(
-            f"{news_item.title}\n\n{news_item.summary}"
-        )
-
-        return news_item.id, rewritten_text
-
-    except Exception:
-        logger.exception("Error while rewriting last news item")
-        return None
-
-    finally:
-        session.close()
+        .order_by(NewsItem.published_at.desc(), NewsItem.id.desc())
+        .limit(limit)
+    )
@@ -0,0 +1,312 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+from typing import Protocol, Sequence
+
+from redis.exceptions import RedisError
+
+from app.cache import LRUCache
+from app.config import settings
+from app.metrics import inc_items, timer
+from app.redis_client import get_redis_client
+
+REWRITE_PROMPT_TEMPLATE = """
+Ты редактор новостей.
+
+Перепиши новость для Telegram:
+— коротко
+— живо
+— 1–2 абзаца
+— без клише
+- без разметки markdown
+
+Текст:
+{text}
+"""
+
+BATCH_PROMPT_TEMPLATE = """
+Ты редактор новостей.
+
+Перепиши каждую из новостей ниже для Telegram:
+— коротко
+— живо
+— 1–2 абзаца
+— без клише
+- без разметки markdown
+
+Новости разделены строками вида "### N", где N — номер новости.
+Ответ дай в том же формате: для каждой новости строка "### N",
+затем переписанный текст. Номера и порядок новостей не меняй.
+
+{articles}
+"""
+
+BATCH_MARKER_RE = re.compile(r"^###\s*(\d+)\s*$", re.MULTILINE)
+
+REWRITE_CACHE_KEY_PREFIX = "rewrite"
+
+logger = logging.getLogger(__name__)
+
+_genai_client = None
+_genai_client_lock = threading.Lock()
+
+
+def get_genai_client():
+    """Один клиент google-genai на процесс"""
+
+    global _genai_client
+    if _genai_client is None:
+        with _genai_client_lock:
+            if _genai_client is None:
+                from google import genai
+                _genai_client = genai.Client()
+    return _genai_client
+
+
+class RewriteBackend(Protocol):
+    model: str
+
+    def generate(self, prompt: str) -> str:
+        ...
+
+
+class GeminiBackend:
+    """Генерация текста через Gemini"""
+
+    def __init__(self, model: str) -> None:
+        self.model = model
+
+    def generate(self, prompt: str) -> str:
+        response = get_genai_client().models.generate_content(
+            model=self.model,
+            contents=prompt,
+        )
+        logger.debug("Model response: %s", response)
+        return response.text.strip()
+
+
+class FakeBackend:
+    """
+    Локальная заглушка для тестов и бенчмарков: без сети, с настраиваемой
+    задержкой. Понимает пакетный формат "### N" и отвечает в нем же.
+    """
+
+    def __init__(self, latency: float = 0.0, model: str = "fake") -> None:
+        self.model = model
+        self.latency = latency
+        self.calls = 0
+
+    @staticmethod
+    def _shorten(text: str) -> str:
+        text = " ".join(text.split())
+        return f"[rewritten] {text[:280]}"
+
+    def generate(self, prompt: str) -> str:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        parts = BATCH_MARKER_RE.split(prompt)
+        if len(parts) > 1:
+            blocks = zip(parts[1::2], parts[2::2])
+            return "\n".join(
+                f"### {number}\n{self._shorten(body)}" for number, body in blocks
+            )
+
+        return self._shorten(prompt.rsplit("Текст:", 1)[-1])
+
+
+def parse_batch_response(response: str, expected: int) -> list[str] | None:
+    """Разбор пакетного ответа; None, если формат не совпал с ожидаемым"""
+
+    parts = BATCH_MARKER_RE.split(response)
+    texts: dict[int, str] = {}
+
+    for number, body in zip(parts[1::2], parts[2::2]):
+        texts[int(number)] = body.strip()
+
+    result = [texts.get(number, "") for number in range(1, expected + 1)]
+    if not all(result):
+        return None
+    return result
+
+
+class Rewriter:
+    """
+    Переписывание новостей с кэшем по хэшу (шаблон промпта, модель, текст).
+    Локальный LRU с TTL плюс общий уровень в Redis с тем же TTL.
+    Пакетный режим упаковывает несколько новостей в один запрос.
+    """
+
+    def __init__(
+        self,
+        backend: RewriteBackend,
+        cache_size: int,
+        cache_ttl: float,
+        shared_cache: bool = True,
+    ) -> None:
+        self.backend = backend
+        self.cache_ttl = cache_ttl
+        self.shared_cache = shared_cache
+        self.local = LRUCache(cache_size, ttl=cache_ttl)
+
+    def cache_key(self, text: str, template: str = REWRITE_PROMPT_TEMPLATE) -> str:
+        """Ключ кэша; template — шаблон, которым получен результат"""
+
+        base = "\0".join((template, self.backend.model, text))
+        digest = hashlib.sha256(base.encode("utf-8")).hexdigest()
+        return f"{REWRITE_CACHE_KEY_PREFIX}:{digest}"
+
+    def _get_cached(self, keys: Sequence[str]) -> list[str | None]:
+        result: list[str | None] = [self.local.get(key) for key in keys]
+
+        pending = [index for index, value in enumerate(result) if value is None]
+        if not pending or not self.shared_cache:
+            return result
+
+        try:
+            values = get_redis_client().mget([keys[index] for index in pending])
+        except RedisError as exc:
+            logger.warning("Rewrite cache Redis error: %s", exc)
+            return result
+
+        for index, value in zip(pending, values):
+            if value is not None:
+                result[index] = value
+                self.local.set(keys[index], value)
+        return result
+
+    def _store(self, key: str, text: str) -> None:
+        self.local.set(key, text)
+        if not self.shared_cache:
+            return
+
+        try:
+            get_redis_client().set(key, text, ex=int(self.cache_ttl))
+        except RedisError as exc:
+            logger.warning("Rewrite cache Redis error: %s", exc)
+
+    def rewrite(self, text: str) -> str:
+        key = self.cache_key(text)
+        cached = self._get_cached([key])[0]
+        if cached is not None:
+            logger.info("Rewrite cache hit")
+            return cached
+
+        logger.info("Rewriting news text")
+        logger.debug("Original text: %s", text)
+
+        with timer("rewrite"):
+            result = self.backend.generate(REWRITE_PROMPT_TEMPLATE.format(text=text))
+        inc_items("rewrite", 1)
+        self._store(key, result)
+        return result
+
+    def _rewrite_batch(self, texts: Sequence[str]) -> list[str | None]:
+        articles = "\n\n".join(
+            f"### {number}\n{text}" for number, text in enumerate(texts, 1)
+        )
+
+        try:
+            with timer("rewrite_batch"):
+                response = self.backend.generate(
+                    BATCH_PROMPT_TEMPLATE.format(articles=articles)
+                )
+            parsed = parse_batch_response(response, len(texts))
+        except Exception:
+            logger.exception("Batch rewrite failed, falling back to single")
+            parsed = None
+
+        if parsed is None:
+            logger.warning("Unexpected batch response, rewriting one by one")
+            return [self._rewrite_or_none(text) for text in texts]
+
+        inc_items("rewrite_batch", len(texts))
+        for text, result in zip(texts, parsed):
+            self._store(self.cache_key(text, BATCH_PROMPT_TEMPLATE), result)
+        return list(parsed)
+
+    def _rewrite_or_none(self, text: str) -> str | None:
+        try:
+            return self.rewrite(text)
+        except Exception:
+            logger.exception("Error while rewriting news text")
+            return None
+
+    def rewrite_many(
+        self,
+        texts: Sequence[str],
+        batch_size: int | None = None,
+    ) -> list[str | None]:
+        """
+        Переписывание нескольких новостей. Промахи кэша отправляются
+        пачками по batch_size новостей в одном запросе.
+        None на месте новости означает ошибку генерации.
+        """
+
+        batch_size = batch_size or settings.rewrite_batch_size
+        results = self._get_cached([self.cache_key(text) for text in texts])
+
+        # результаты пакетного режима лежат под ключом пакетного шаблона
+        pending = [index for index, value in enumerate(results) if value is None]
+        if pending:
+            batch_cached = self._get_cached(
+                [
+                    self.cache_key(texts[index], BATCH_PROMPT_TEMPLATE)
+                    for index in pending
+                ]
+            )
+            for index, value in zip(pending, batch_cached):
+                results[index] = value
+
+        pending = [index for index, value in enumerate(results) if value is None]
+        logger.info(
+            "Rewriting %s texts: cached=%s, batch_size=%s",
+            len(texts),
+            len(texts) - len(pending),
+            batch_size,
+        )
+
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+
+            if len(chunk) == 1:
+                rewritten = [self._rewrite_or_none(texts[chunk[0]])]
+            else:
+                rewritten = self._rewrite_batch([texts[index] for index in chunk])
+
+            for index, result in zip(chunk, rewritten):
+                results[index] = result
+
+        return results
+
+
+_rewriter: Rewriter | None = None
+
+
+def make_backend() -> RewriteBackend:
+    if settings.rewrite_backend == "fake":
+        return FakeBackend(latency=settings.rewrite_fake_latency)
+    if settings.rewrite_backend == "gemini":
+        return GeminiBackend(model=settings.rewrite_model)
+    raise ValueError(f"Unknown rewrite backend: {settings.rewrite_backend}")
+
+
+def get_rewriter() -> Rewriter:
+    global _rewriter
+    if _rewriter is None:
+        _rewriter = Rewriter(
+            backend=make_backend(),
+            cache_size=settings.rewrite_cache_size,
+            cache_ttl=settings.rewrite_cache_ttl,
+        )
+    return _rewriter
+
+
+def set_rewriter(rewriter: Rewriter | None) -> None:
+    """Подмена реализации (офлайн-тесты и бенчмарки)"""
+
+    global _rewriter
+    _rewriter = rewriter
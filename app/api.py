@@ -1,9 +1,32 @@
 import logging
-from fastapi import APIRouter, status
-from app.news_parser import collect_from_all_source, save_news_to_db
-from app.redis_client import ping_redis
-from app.schemas import NewsItem
-from app.tasks import ping
+from datetime import datetime
+from celery.result import AsyncResult
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from redis.exceptions import RedisError
+from app.celery_app import celery_app
+from app.news_parser import (
+    SOURCE,
+    collect_from_all_source,
+    iter_news_from_all_source,
+    save_news_to_db,
+)
+from app.config import settings
+from app.listing import InvalidCursor, list_news, list_posts
+from app.metrics import render_prometheus
+from app.news_parser.latest import read_latest, rebuild_latest
+from app.news_parser.utils import get_embedding_cache
+from app.poll_scheduler import get_poll_state
+from app.post_queue import get_queue_depth
+from app.redis_client import NEWS_LATEST_LIMIT, ping_redis
+from app.news_parser.vector_index import search_news
+from app.schemas import NewsItem, NewsSearchResult
+from app.tasks import (
+    fill_post_queue_task,
+    ping,
+    scrape_news_and_save as scrape_news_and_save_task,
+)
 from app.telegram.publisher import make_post_service
 
 logger = logging.getLogger(__name__)
@@ -29,6 +52,14 @@ async def health_check():
 
 
 
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(
+        render_prometheus(),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
 @router.get(
     "/news/scrape/",
     response_model=list[NewsItem],
@@ -37,7 +68,7 @@ async def health_check():
 async def scrape_news():
     logger.info("Scraping news without saving")
 
-    news_items = collect_from_all_source()
+    news_items = await run_in_threadpool(collect_from_all_source)
 
     logger.info("Scraped %s news items", len(news_items))
     return news_items
@@ -51,12 +82,181 @@ async def scrape_news():
 async def scrape_news_and_save():
     logger.info("Scraping news and saving to database")
 
-    saved_count = save_news_to_db()
+    saved_count = await run_in_threadpool(save_news_to_db)
 
     logger.info("Saved %s news items to database", saved_count)
     return saved_count
 
 
+def _stream_news_ndjson():
+    for news_item in iter_news_from_all_source():
+        yield NewsItem.model_validate(news_item, from_attributes=True).model_dump_json()
+        yield "\n"
+
+
+@router.get("/news/scrape/stream", status_code=status.HTTP_200_OK)
+async def scrape_news_stream():
+    """NDJSON: по одной новости в строке, сразу после нормализации"""
+    logger.info("Streaming scraped news")
+    return StreamingResponse(
+        _stream_news_ndjson(),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.post("/news/scrape_and_save/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def scrape_news_and_save_job():
+    logger.info("Dispatching scrape and save job")
+    task = scrape_news_and_save_task.delay()
+    return {"job_id": task.id}
+
+
+@router.get("/jobs/{job_id}", status_code=status.HTTP_200_OK)
+def job_status(job_id: str):
+    # обычный def: запросы к result backend выполняются в пуле потоков
+    result = AsyncResult(job_id, app=celery_app)
+    state = result.state
+
+    response = {"job_id": job_id, "status": state}
+    if state == "SUCCESS":
+        response["result"] = result.result
+    elif state == "FAILURE":
+        response["error"] = repr(result.result)
+    return response
+
+
+@router.get(
+    "/news/search",
+    response_model=list[NewsSearchResult],
+    status_code=status.HTTP_200_OK,
+)
+async def news_search(
+    q: str = Query(..., min_length=2),
+    k: int = Query(10, ge=1, le=100),
+):
+    logger.info("Semantic search: %s", q)
+    return await run_in_threadpool(search_news, q, k)
+
+
+@router.get("/news/", status_code=status.HTTP_200_OK)
+async def news_list(
+    source: str | None = None,
+    is_relevant: bool | None = None,
+    news_status: str | None = Query(None, alias="status"),
+    published_from: datetime | None = None,
+    published_to: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+):
+    """Сохраненные новости; следующая страница — по next_cursor"""
+
+    try:
+        return await run_in_threadpool(
+            list_news,
+            source=source,
+            is_relevant=is_relevant,
+            status=news_status,
+            published_from=published_from,
+            published_to=published_to,
+            cursor=cursor,
+            limit=limit,
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(exc)) from exc
+
+
+@router.get("/news/latest/", status_code=status.HTTP_200_OK)
+def news_latest(
+    limit: int = Query(20, ge=1, le=NEWS_LATEST_LIMIT),
+):
+    """
+    Последние новости из Redis. JSON записей хранится готовым
+    и отдается без разбора; пустая лента восстанавливается из БД.
+    """
+
+    try:
+        payloads = read_latest(limit)
+    except RedisError as exc:
+        logger.warning("Latest news feed unavailable: %s", exc)
+        payloads = None
+
+    if payloads is None:
+        payloads = rebuild_latest(limit)
+
+    return Response(
+        content="[" + ",".join(payloads) + "]",
+        media_type="application/json",
+    )
+
+
+@router.get("/news/embedding_cache/", status_code=status.HTTP_200_OK)
+def embedding_cache_stats():
+    cache = get_embedding_cache()
+    return {
+        "process": cache.stats(),
+        "shared": cache.shared_stats(),
+    }
+
+
+@router.get("/news/sources/", status_code=status.HTTP_200_OK)
+def source_poll_state():
+    try:
+        sources = {
+            source_name: get_poll_state(source_name)
+            for source_name, _ in SOURCE
+        }
+    except RedisError as exc:
+        logger.warning("Source poll state unavailable: %s", exc)
+        return {
+            "mode": settings.scrape_schedule,
+            "sources": None,
+            "error": "redis unavailable",
+        }
+
+    return {
+        "mode": settings.scrape_schedule,
+        "sources": sources,
+    }
+
+
+@router.get("/posts/", status_code=status.HTTP_200_OK)
+async def posts_list(
+    post_status: str | None = Query(None, alias="status"),
+    published_from: datetime | None = None,
+    published_to: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+):
+    """Посты; следующая страница — по next_cursor"""
+
+    try:
+        return await run_in_threadpool(
+            list_posts,
+            status=post_status,
+            published_from=published_from,
+            published_to=published_to,
+            cursor=cursor,
+            limit=limit,
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(exc)) from exc
+
+
+@router.get("/posts/queue/", status_code=status.HTTP_200_OK)
+def post_queue_state():
+    return {
+        "depth": get_queue_depth(),
+        "target": settings.post_queue_depth,
+    }
+
+
+@router.post("/posts/queue/fill", status_code=status.HTTP_202_ACCEPTED)
+async def fill_post_queue():
+    logger.info("Dispatching post queue fill")
+    task = fill_post_queue_task.delay()
+    return {"task_id": task.id}
+
+
 @router.post("/telegram/post", status_code=status.HTTP_200_OK)
 async def make_post():
     logger.info("Creating Telegram post")
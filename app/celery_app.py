@@ -2,6 +2,12 @@ from celery import Celery
 from app.config import settings
 from datetime import timedelta
 
+QUEUE_DEFAULT = "newsbot"
+QUEUE_IO = "io"  # HTTP, диспетчеризация
+QUEUE_CPU = "cpu"  # эмбеддинги MiniLM и запись в БД
+QUEUE_LLM = "llm"  # переписывание постов в Gemini
+QUEUE_TELEGRAM = "telegram"  # публикация; один процесс на файл сессии Telethon
+
 celery_app = Celery(
     "newsbot",
     broker=settings.redis_url,
@@ -16,15 +22,47 @@ celery_app.conf.update(
     result_serializer="json",
     broker_connection_retry_on_startup=True,
     result_expires=3600,
-    task_default_queue="newsbot",
+    task_default_queue=QUEUE_DEFAULT,
+    task_routes={
+        "app.tasks.scrape_news_and_save": {"queue": QUEUE_IO},
+        "app.tasks.dispatch_source_scrapes": {"queue": QUEUE_IO},
+        "app.tasks.scrape_source": {"queue": QUEUE_IO},
+        "app.tasks.sum_counts": {"queue": QUEUE_IO},
+        "app.tasks.fetch_articles": {"queue": QUEUE_IO},
+        "app.tasks.make_post": {"queue": QUEUE_TELEGRAM},
+        "app.tasks.score_news": {"queue": QUEUE_CPU},
+        "app.tasks.save_news_batch": {"queue": QUEUE_CPU},
+        "app.tasks.fill_post_queue": {"queue": QUEUE_LLM},
+    },
+    # длинные задачи cpu/llm не копятся у одного процесса;
+    # для io-воркера множитель поднимается флагом --prefetch-multiplier
+    worker_prefetch_multiplier=1,
 )
 
 
 
+if settings.scrape_schedule == "fixed":
+    scrape_schedule = {
+        "scrape-news-every-hour": {
+            "task": "app.tasks.scrape_news_and_save",
+            "schedule": timedelta(hours=1),
+        },
+    }
+else:
+    # диспетчер часто проверяет, каким источникам пора на опрос;
+    # интервал каждого источника подстраивается под поток новостей
+    scrape_schedule = {
+        "dispatch-source-scrapes": {
+            "task": "app.tasks.dispatch_source_scrapes",
+            "schedule": timedelta(seconds=settings.scrape_dispatch_interval),
+        },
+    }
+
 celery_app.conf.beat_schedule = {
-    "scrape-news-every-hour": {
-        "task": "app.tasks.scrape_news_and_save",
-        "schedule": timedelta(hours=1),
+    **scrape_schedule,
+    "fill-post-queue-every-10-min": {
+        "task": "app.tasks.fill_post_queue",
+        "schedule": timedelta(minutes=10),
     },
     "make-post-every-20-min": {
         "task": "app.tasks.make_post",
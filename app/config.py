@@ -8,12 +8,88 @@ class Settings(BaseSettings):
     redis_url: str = 'redis://127.0.0.1:6379/0'
     DATABASE_URL: str = 'sqlite:///news.db'
 
+    sqlite_journal_mode: str = 'wal'
+    sqlite_synchronous: str = 'normal'
+    sqlite_busy_timeout: int = 30_000  # мс
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size: int = -64_000  # отрицательное значение — в КиБ
+    sqlite_begin: str = 'driver'  # driver / deferred / immediate
+
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_statement_timeout: int = 30_000  # мс
+
     telegram_api_id: int = 0
     telegram_api_hash: str = ''
     telegram_channel_id: str = ''
+    telegram_session: str = 'session'
+    telegram_send_retries: int = 3
+    telegram_max_flood_wait: int = 300
 
     GEMINI_API_KEY: str = ''
 
+    embedding_backend: str = 'torch'  # torch / onnx / torch-int8
+    embedding_onnx_file: str = ''
+    embedding_warmup: bool = True
+
+    embedding_cache_local_size: int = 10_000
+    embedding_cache_shared_size: int = 100_000
+
+    article_fetch_workers: int = 8
+    article_fetch_per_host: int = 4
+    article_fetch_budget: float = 60.0
+
+    source_timeout: float = 120.0
+    scrape_max_pages: int = 5
+    scrape_max_items: int = 100
+
+    scrape_schedule: str = 'adaptive'  # adaptive / fixed
+    scrape_pipeline: bool = True  # конвейер задач io/cpu вместо одной задачи
+    scrape_dispatch_interval: int = 60
+    scrape_min_interval: int = 300
+    scrape_max_interval: int = 3600
+    scrape_target_new_items: float = 5.0
+
+    http_pool_connections: int = 10
+    http_pool_maxsize: int = 16
+    http_retries: int = 3
+    http_backoff_factor: float = 0.5
+    http_cache_dir: str = '.http_cache'
+
+    html_backend: str = 'html.parser+strainer'  # auto / html.parser / html.parser+strainer
+
+    post_max_age_hours: int = 48
+    post_queue_depth: int = 3
+
+    dedup_enabled: bool = True
+    dedup_threshold: float = 0.85
+    dedup_window_hours: int = 48
+    dedup_max_recent: int = 2000
+
+    vector_index_dir: str = 'data/vectors'
+    vector_ann_threshold: int = 200_000
+    vector_ann_nprobe: int = 8
+
+    rewrite_backend: str = 'gemini'  # gemini / fake
+    rewrite_model: str = 'gemini-3-flash-preview'
+    rewrite_batch_size: int = 3
+    rewrite_cache_size: int = 1000
+    rewrite_cache_ttl: int = 7 * 24 * 3600
+    rewrite_fake_latency: float = 0.0
+
+    @property
+    def telegram_channel_ids(self) -> list[int | str]:
+        """Один или несколько каналов через запятую: id или @username"""
+        channel_ids: list[int | str] = []
+        for part in self.telegram_channel_id.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            channel_ids.append(int(part) if part.lstrip('-').isdigit() else part)
+        return channel_ids
+
     @property
     def keywords_list(self) -> list[str]:
         raw_value = self.news_keywords
@@ -1,11 +1,102 @@
-from sqlalchemy import create_engine
+import logging
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False},
-)
+SQLITE_BEGIN_MODES = ("driver", "deferred", "immediate")
+
+logger = logging.getLogger(__name__)
+
+
+def _create_sqlite_engine(url) -> Engine:
+    """
+    SQLite для нескольких процессов (API, beat, воркеры): WAL позволяет
+    читать во время записи, busy_timeout — ждать блокировку вместо
+    мгновенного "database is locked".
+
+    Режим начала транзакций (sqlite_begin):
+    driver — BEGIN выдает драйвер перед первым INSERT/UPDATE, чтения
+    идут без транзакции и не держат снимок; deferred/immediate — BEGIN
+    на каждую транзакцию SQLAlchemy. deferred в WAL падает с "locked"
+    без ожидания, если SELECT и затем UPDATE конкурируют с записью.
+    """
+
+    begin_mode = settings.sqlite_begin.lower()
+    if begin_mode not in SQLITE_BEGIN_MODES:
+        raise ValueError(
+            f"Unknown SQLITE_BEGIN {begin_mode!r}, expected one of {SQLITE_BEGIN_MODES}"
+        )
+
+    engine = create_engine(
+        url,
+        connect_args={
+            "check_same_thread": False,
+            "timeout": settings.sqlite_busy_timeout / 1000,
+        },
+    )
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.sqlite_cache_size)}")
+        cursor.close()
+
+        if begin_mode != "driver":
+            # транзакциями управляет SQLAlchemy (событие begin ниже)
+            dbapi_connection.isolation_level = None
+
+    if begin_mode != "driver":
+        @event.listens_for(engine, "begin")
+        def begin_sqlite_transaction(connection):
+            connection.exec_driver_sql(f"BEGIN {begin_mode.upper()}")
+
+    return engine
+
+
+def _create_server_engine(url) -> Engine:
+    """PostgreSQL и другие серверные СУБД: пул соединений и таймауты"""
+
+    connect_args = {}
+    if url.get_backend_name() == "postgresql" and url.get_driver_name() != "asyncpg":
+        connect_args["options"] = (
+            f"-c statement_timeout={int(settings.db_statement_timeout)}"
+        )
+
+    return create_engine(
+        url,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=True,
+        connect_args=connect_args,
+    )
+
+
+def create_db_engine(database_url: str | None = None) -> Engine:
+    """Движок БД с настройками под СУБД из DATABASE_URL"""
+
+    url = make_url(database_url or settings.DATABASE_URL)
+
+    if url.get_backend_name() == "sqlite":
+        engine = _create_sqlite_engine(url)
+    else:
+        engine = _create_server_engine(url)
+
+    logger.debug(
+        "Database engine created: %s",
+        url.render_as_string(hide_password=True),
+    )
+    return engine
+
+
+engine = create_db_engine()
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -16,3 +107,17 @@ SessionLocal = sessionmaker(
 Base = declarative_base()
 
 
+def init_db() -> None:
+    """
+    Создание таблиц и недостающих индексов.
+    create_all не добавляет индексы в уже существующие таблицы,
+    поэтому индексы создаются отдельно с checkfirst.
+    """
+
+    import app.models  # noqa: F401 — регистрация моделей в Base.metadata
+
+    Base.metadata.create_all(bind=engine)
+
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
@@ -0,0 +1,159 @@
+import base64
+import json
+import logging
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Select, and_, or_, select
+
+from app.database import SessionLocal
+from app.models import NewsItem, Post
+
+NEWS_LIST_COLUMNS = (
+    NewsItem.id,
+    NewsItem.title,
+    NewsItem.url,
+    NewsItem.source,
+    NewsItem.published_at,
+    NewsItem.is_relevant,
+    NewsItem.status,
+    NewsItem.keywords,
+)
+
+POST_LIST_COLUMNS = (
+    Post.id,
+    Post.news_id,
+    Post.generated_text,
+    Post.published_at,
+    Post.status,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(published_at: datetime | None, row_id: str) -> str:
+    raw = json.dumps(
+        [published_at.isoformat() if published_at else None, row_id],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime | None, str]:
+    try:
+        published_at, row_id = json.loads(base64.urlsafe_b64decode(cursor))
+        return (
+            datetime.fromisoformat(published_at) if published_at else None,
+            str(row_id),
+        )
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor("Некорректный курсор") from exc
+
+
+def _keyset_page(
+    stmt: Select,
+    model,
+    cursor: str | None,
+    limit: int,
+    with_undated: bool,
+) -> dict[str, Any]:
+    """
+    Страница по ключу (published_at, id), свежие первыми.
+    Новости без даты идут после всех датированных, упорядоченные по id:
+    так в обоих проходах работает индекс (published_at, id) и порядок
+    NULL не зависит от СУБД. Глубина страницы на стоимость не влияет.
+    """
+
+    after_at, after_id = decode_cursor(cursor) if cursor else (None, None)
+    order = (model.published_at.desc(), model.id.desc())
+
+    session = SessionLocal()
+
+    try:
+        rows = []
+
+        # 1. датированные записи, если курсор еще не перешел к недатированным
+        if after_id is None or after_at is not None:
+            dated = stmt.where(model.published_at.is_not(None))
+            if after_id is not None:
+                dated = dated.where(
+                    or_(
+                        model.published_at < after_at,
+                        and_(
+                            model.published_at == after_at,
+                            model.id < after_id,
+                        ),
+                    )
+                )
+            rows = session.execute(dated.order_by(*order).limit(limit + 1)).all()
+
+        # 2. записи без даты дочитываются в ту же страницу
+        if with_undated and len(rows) <= limit:
+            undated = stmt.where(model.published_at.is_(None))
+            if after_id is not None and after_at is None:
+                undated = undated.where(model.id < after_id)
+            rows += session.execute(
+                undated.order_by(model.id.desc()).limit(limit + 1 - len(rows))
+            ).all()
+    finally:
+        session.close()
+
+    items = [dict(row._mapping) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last["published_at"], last["id"])
+
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def list_news(
+    source: str | None = None,
+    is_relevant: bool | None = None,
+    status: str | None = None,
+    published_from: datetime | None = None,
+    published_to: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = 50,
+) -> dict[str, Any]:
+    """Сохраненные новости с фильтрами и keyset-пагинацией"""
+
+    stmt = select(*NEWS_LIST_COLUMNS)
+    if source is not None:
+        stmt = stmt.where(NewsItem.source == source)
+    if is_relevant is not None:
+        stmt = stmt.where(NewsItem.is_relevant.is_(is_relevant))
+    if status is not None:
+        stmt = stmt.where(NewsItem.status == status)
+    if published_from is not None:
+        stmt = stmt.where(NewsItem.published_at >= published_from)
+    if published_to is not None:
+        stmt = stmt.where(NewsItem.published_at < published_to)
+
+    with_undated = published_from is None and published_to is None
+    return _keyset_page(stmt, NewsItem, cursor, limit, with_undated)
+
+
+def list_posts(
+    status: str | None = None,
+    published_from: datetime | None = None,
+    published_to: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = 50,
+) -> dict[str, Any]:
+    """Посты с фильтрами и keyset-пагинацией; неопубликованные — в конце"""
+
+    stmt = select(*POST_LIST_COLUMNS)
+    if status is not None:
+        stmt = stmt.where(Post.status == status)
+    if published_from is not None:
+        stmt = stmt.where(Post.published_at >= published_from)
+    if published_to is not None:
+        stmt = stmt.where(Post.published_at < published_to)
+
+    with_undated = published_from is None and published_to is None
+    return _keyset_page(stmt, Post, cursor, limit, with_undated)
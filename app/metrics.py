@@ -0,0 +1,187 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Iterator
+
+from redis.exceptions import RedisError
+
+from app.redis_client import get_redis_client
+
+METRICS_KEY = "metrics:newsbot"
+
+DURATION_METRIC = "newsbot_stage_duration_seconds"
+ITEMS_METRIC = "newsbot_stage_items_total"
+ERRORS_METRIC = "newsbot_stage_errors_total"
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+DEFAULT_SOURCE = "all"
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+# (stage, source) -> [count по бакетам..., +Inf]
+_buckets: dict[tuple[str, str], list[int]] = defaultdict(
+    lambda: [0] * (len(BUCKETS) + 1)
+)
+_sums: dict[tuple[str, str], float] = defaultdict(float)
+_items: dict[tuple[str, str], int] = defaultdict(int)
+_errors: dict[tuple[str, str], int] = defaultdict(int)
+
+
+def _bucket_index(seconds: float) -> int:
+    for index, bound in enumerate(BUCKETS):
+        if seconds <= bound:
+            return index
+    return len(BUCKETS)
+
+
+def observe(stage: str, seconds: float, source: str = DEFAULT_SOURCE) -> None:
+    key = (stage, source)
+    index = _bucket_index(seconds)
+    with _lock:
+        _buckets[key][index] += 1
+        _sums[key] += seconds
+
+
+def inc_items(stage: str, count: int, source: str = DEFAULT_SOURCE) -> None:
+    with _lock:
+        _items[(stage, source)] += count
+
+
+@contextmanager
+def timer(stage: str, source: str = DEFAULT_SOURCE) -> Iterator[None]:
+    """Замер длительности этапа; исключения считаются в errors_total"""
+
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        with _lock:
+            _errors[(stage, source)] += 1
+        raise
+    finally:
+        observe(stage, time.perf_counter() - started, source)
+
+
+def _drain() -> tuple[dict, dict, dict, dict]:
+    with _lock:
+        snapshot = (dict(_buckets), dict(_sums), dict(_items), dict(_errors))
+        _buckets.clear()
+        _sums.clear()
+        _items.clear()
+        _errors.clear()
+    return snapshot
+
+
+def _field(kind: str, stage: str, source: str, suffix: str = "") -> str:
+    return "|".join((kind, stage, source, suffix))
+
+
+def flush_to_redis() -> None:
+    """
+    Перенос накопленных в процессе значений в общий hash в Redis.
+    Вызывается после каждой Celery-задачи и перед отдачей /metrics.
+    """
+
+    buckets, sums, items, errors = _drain()
+    if not (buckets or items or errors):
+        return
+
+    try:
+        pipe = get_redis_client().pipeline(transaction=False)
+        for (stage, source), counts in buckets.items():
+            for index, count in enumerate(counts):
+                if count:
+                    pipe.hincrby(METRICS_KEY, _field("b", stage, source, str(index)), count)
+            pipe.hincrbyfloat(METRICS_KEY, _field("s", stage, source), sums[(stage, source)])
+        for (stage, source), count in items.items():
+            pipe.hincrby(METRICS_KEY, _field("i", stage, source), count)
+        for (stage, source), count in errors.items():
+            pipe.hincrby(METRICS_KEY, _field("e", stage, source), count)
+        pipe.execute()
+    except RedisError as exc:
+        logger.warning("Could not push metrics to Redis: %s", exc)
+        # вернем значения обратно, чтобы не потерять
+        with _lock:
+            for key, counts in buckets.items():
+                for index, count in enumerate(counts):
+                    _buckets[key][index] += count
+                _sums[key] += sums[key]
+            for key, count in items.items():
+                _items[key] += count
+            for key, count in errors.items():
+                _errors[key] += count
+
+
+def _load() -> tuple[dict, dict, dict, dict]:
+    """Агрегат из Redis, при недоступности — значения текущего процесса"""
+
+    buckets: dict[tuple[str, str], list[int]] = defaultdict(
+        lambda: [0] * (len(BUCKETS) + 1)
+    )
+    sums: dict[tuple[str, str], float] = defaultdict(float)
+    items: dict[tuple[str, str], int] = defaultdict(int)
+    errors: dict[tuple[str, str], int] = defaultdict(int)
+
+    flush_to_redis()
+
+    try:
+        raw = get_redis_client().hgetall(METRICS_KEY)
+    except RedisError as exc:
+        logger.warning("Could not read metrics from Redis: %s", exc)
+        with _lock:
+            return dict(_buckets), dict(_sums), dict(_items), dict(_errors)
+
+    for field, value in raw.items():
+        kind, stage, source, suffix = field.split("|")
+        key = (stage, source)
+        if kind == "b":
+            buckets[key][int(suffix)] += int(value)
+        elif kind == "s":
+            sums[key] += float(value)
+        elif kind == "i":
+            items[key] += int(value)
+        elif kind == "e":
+            errors[key] += int(value)
+
+    return buckets, sums, items, errors
+
+
+def _labels(stage: str, source: str, **extra: str) -> str:
+    labels = {"stage": stage, "source": source, **extra}
+    return ",".join(f'{name}="{value}"' for name, value in labels.items())
+
+
+def render_prometheus() -> str:
+    """Текстовый формат экспозиции Prometheus"""
+
+    buckets, sums, items, errors = _load()
+    lines = [
+        f"# HELP {DURATION_METRIC} Duration of pipeline stages.",
+        f"# TYPE {DURATION_METRIC} histogram",
+    ]
+
+    for (stage, source), counts in sorted(buckets.items()):
+        cumulative = 0
+        for bound, count in zip(BUCKETS + (float("inf"),), counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(
+                f"{DURATION_METRIC}_bucket{{{_labels(stage, source, le=le)}}} {cumulative}"
+            )
+        lines.append(f"{DURATION_METRIC}_sum{{{_labels(stage, source)}}} {sums[(stage, source)]}")
+        lines.append(f"{DURATION_METRIC}_count{{{_labels(stage, source)}}} {cumulative}")
+
+    for metric, values, help_text in (
+        (ITEMS_METRIC, items, "Items processed by pipeline stages."),
+        (ERRORS_METRIC, errors, "Failed pipeline stage runs."),
+    ):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for (stage, source), value in sorted(values.items()):
+            lines.append(f"{metric}{{{_labels(stage, source)}}} {value}")
+
+    return "\n".join(lines) + "\n"
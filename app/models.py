@@ -1,6 +1,6 @@
 import uuid
 import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Boolean, Index
 from app.database import Base
 
 
@@ -28,6 +28,21 @@ class NewsItem(Base):
 
     status = Column(String, nullable=True)
 
+    __table_args__ = (
+        # частичный индекс под выбор следующей новости для поста:
+        # только релевантные и еще не обработанные, свежие первыми
+        Index(
+            "ix_news_pending_published_at",
+            published_at.desc(),
+            sqlite_where=is_relevant.is_(True) & status.is_(None),
+            postgresql_where=is_relevant.is_(True) & status.is_(None),
+        ),
+        # keyset-пагинация списка новостей по (published_at, id),
+        # в том числе с фильтром по источнику
+        Index("ix_news_published_at_id", published_at, id),
+        Index("ix_news_source_published_at_id", source, published_at, id),
+    )
+
 
 class Post(Base):
     __tablename__ = "posts"
@@ -52,5 +67,10 @@ class Post(Base):
         String,
         default="published",
         nullable=False,
-    )  # new / generated / published / failed
+    )  # new / generated / sending / published / failed / expired
+
+    __table_args__ = (
+        Index("ix_posts_published_at_id", "published_at", "id"),
+        Index("ix_posts_status_published_at_id", "status", "published_at", "id"),
+    )
 
@@ -1,11 +1,31 @@
 import hashlib
 import logging
-from typing import Any, Mapping
+import queue
+import threading
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Iterable, Iterator, Mapping
 
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
 from app.database import SessionLocal
+from app.metrics import inc_items, observe, timer
 from app.models import NewsItem
 from app.news_parser import cnews, habr
-from app.news_parser.utils import is_relevant, normalize_published_at
+from app.news_parser.dedup import mark_near_duplicates
+from app.news_parser.http import SourceFetchError
+from app.news_parser.known_urls import mark_urls_seen
+from app.news_parser.latest import write_through_latest
+from app.news_parser.vector_index import append_news_vectors
+from app.news_parser.watermarks import update_watermarks
+from app.news_parser.utils import (
+    get_embedding_cache,
+    normalize_published_at,
+    score_relevance,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +34,20 @@ SOURCE = (
     ("cnews", cnews.fetch_cnews_news_list),
 )
 
+# источники, у которых полный текст лежит на отдельной странице статьи:
+# в конвейере Celery список и статьи загружаются разными задачами,
+# статьи — пачкой через fetch_all с лимитом на хост и бюджетом времени
+ARTICLE_SOURCE = {
+    "cnews": (cnews.fetch_cnews_entries, cnews.fill_cnews_summaries),
+}
+
+# подтверждение ETag/Last-Modified ленты источника: только после того,
+# как ее новости сохранены, иначе следующий запуск получит 304 и потеряет их
+LIST_CACHE_COMMIT = {
+    "habr": habr.commit_habr_news_list,
+    "cnews": cnews.commit_cnews_news_list,
+}
+
 
 def make_news_id(source: str, url: str) -> str:
     base = f"{source}:{url}"
@@ -69,7 +103,6 @@ def normalize_raw_news(
         source=source,
         published_at=published_at_dt,
         keywords=keywords,
-        is_relevant=is_relevant(title, summary),
     )
 
     logger.debug(
@@ -81,69 +114,389 @@ def normalize_raw_news(
     return news_item
 
 
-def collect_from_all_source() -> list[NewsItem]:
-    """Парсинг всех источников"""
+def apply_relevance(news_items: list[NewsItem]) -> None:
+    """Пакетная оценка релевантности всех собранных новостей"""
 
-    collected_news: list[NewsItem] = []
+    if not news_items:
+        return
 
-    for source_name, fetch_func in SOURCE:
-        logger.info("Fetching news from source: %s", source_name)
+    with timer("relevance"):
+        flags = score_relevance(
+            [(news_item.title, news_item.summary) for news_item in news_items]
+        )
+    inc_items("relevance", len(news_items))
+    for news_item, flag in zip(news_items, flags):
+        news_item.is_relevant = flag
+
+    logger.info(
+        "Scored relevance for %s news items, relevant=%s, cache=%s",
+        len(news_items),
+        sum(flags),
+        get_embedding_cache().stats(),
+    )
 
+
+def iter_source_news(
+    source_name: str,
+    fetch_func: Callable[..., list[dict]],
+    skip_known: bool = False,
+) -> Iterator[NewsItem]:
+    """Парсинг одного источника, новости отдаются по мере нормализации"""
+
+    logger.info("Fetching news from source: %s", source_name)
+    started = time.perf_counter()
+
+    raw_items = fetch_func(skip_known=skip_known)
+    normalized = 0
+    normalize_started = time.perf_counter()
+
+    for raw_item in raw_items:
         try:
-            raw_items = fetch_func()
+            news_item = normalize_raw_news(
+                source_name=source_name,
+                raw_item=raw_item,
+            )
+        except Exception:
+            logger.exception(
+                "Ошибка при нормализации новости из %s",
+                source_name,
+            )
+            continue
+
+        normalized += 1
+        yield news_item
+
+    observe("normalize", time.perf_counter() - normalize_started, source_name)
+    inc_items("normalize", normalized, source_name)
+    observe("source", time.perf_counter() - started, source_name)
+
+    logger.info(
+        "Source %s: %s raw items, %s normalized in %.2fs",
+        source_name,
+        len(raw_items),
+        normalized,
+        time.perf_counter() - started,
+    )
+
+
+def collect_from_source(
+    source_name: str,
+    fetch_func: Callable[..., list[dict]],
+    skip_known: bool = False,
+) -> list[NewsItem]:
+    """Парсинг и нормализация новостей одного источника"""
+
+    return list(iter_source_news(source_name, fetch_func, skip_known))
+
+
+def iter_news_from_all_source(skip_known: bool = False) -> Iterator[NewsItem]:
+    """
+    Параллельный парсинг всех источников с выдачей каждой новости
+    сразу после нормализации (для потоковых ответов API).
+    Релевантность здесь не вычисляется.
+    """
+
+    items_queue: queue.Queue = queue.Queue()
+    source_done = object()
+
+    def produce(source_name: str, fetch_func: Callable[..., list[dict]]) -> None:
+        try:
+            for news_item in iter_source_news(source_name, fetch_func, skip_known):
+                items_queue.put(news_item)
+        except SourceFetchError as exc:
+            logger.warning("Source %s unavailable: %s", source_name, exc)
         except Exception:
             logger.exception(
                 "Ошибка при парсинге новостей из источника %s",
                 source_name,
             )
+        finally:
+            items_queue.put(source_done)
+
+    for source_name, fetch_func in SOURCE:
+        threading.Thread(
+            target=produce,
+            args=(source_name, fetch_func),
+            name=f"source-{source_name}",
+            daemon=True,
+        ).start()
+
+    deadline = time.monotonic() + settings.source_timeout
+    running = len(SOURCE)
+
+    while running:
+        try:
+            item = items_queue.get(timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            logger.error(
+                "Sources timed out after %ss while streaming",
+                settings.source_timeout,
+            )
+            return
+
+        if item is source_done:
+            running -= 1
             continue
 
-        for raw_item in raw_items:
+        yield item
+
+
+def collect_from_all_source(skip_known: bool = False) -> list[NewsItem]:
+    """
+    Парсинг всех источников.
+    Источники опрашиваются параллельно, ошибка или таймаут одного
+    не влияют на остальные. skip_known=True отбрасывает уже сохраненные
+    в БД новости до загрузки их полного текста.
+    """
+
+    collected_news, _ = _collect_sources(skip_known)
+    return collected_news
+
+
+def _collect_sources(skip_known: bool) -> tuple[list[NewsItem], list[str]]:
+    """Новости всех источников и имена источников, опрошенных без ошибок"""
+
+    collected_news: list[NewsItem] = []
+    completed: list[str] = []
+
+    executor = ThreadPoolExecutor(
+        max_workers=len(SOURCE),
+        thread_name_prefix="source",
+    )
+    futures = {
+        executor.submit(
+            collect_from_source,
+            source_name,
+            fetch_func,
+            skip_known,
+        ): source_name
+        for source_name, fetch_func in SOURCE
+    }
+
+    try:
+        for future in as_completed(futures, timeout=settings.source_timeout):
+            source_name = futures[future]
             try:
-                news_item = normalize_raw_news(
-                    source_name=source_name,
-                    raw_item=raw_item,
+                collected_news.extend(future.result())
+                completed.append(source_name)
+            except SourceFetchError as exc:
+                logger.warning("Source %s unavailable: %s", source_name, exc)
+            except Exception:
+                logger.exception(
+                    "Ошибка при парсинге новостей из источника %s",
+                    source_name,
                 )
+    except TimeoutError:
+        logger.error(
+            "Sources timed out after %ss: %s",
+            settings.source_timeout,
+            [futures[future] for future in futures if not future.done()],
+        )
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    apply_relevance(collected_news)
+
+    logger.info("Collected %s news items", len(collected_news))
+    return collected_news, completed
+
+
+def fetch_source_entries(source_name: str) -> list[dict]:
+    """
+    Новые сырые новости источника для конвейера Celery: без полных
+    текстов статей (см. ARTICLE_SOURCE), даты — строками ISO для JSON.
+    """
+
+    if source_name in ARTICLE_SOURCE:
+        fetch_func = ARTICLE_SOURCE[source_name][0]
+    else:
+        fetch_func = dict(SOURCE)[source_name]
+
+    return [
+        {
+            key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in raw_item.items()
+        }
+        for raw_item in fetch_func(skip_known=True)
+    ]
+
+
+def fetch_source_articles(source_name: str, raw_items: list[dict]) -> list[dict]:
+    """Полные тексты статей для записей списка (см. ARTICLE_SOURCE)"""
+
+    return ARTICLE_SOURCE[source_name][1](raw_items)
+
+
+def build_news_items(source_name: str, raw_items: list[dict]) -> list[NewsItem]:
+    """Нормализация сырых новостей и пакетная оценка релевантности"""
+
+    news_items: list[NewsItem] = []
+    with timer("normalize", source_name):
+        for raw_item in raw_items:
+            try:
+                news_items.append(normalize_raw_news(source_name, raw_item))
             except Exception:
                 logger.exception(
                     "Ошибка при нормализации новости из %s",
                     source_name,
                 )
-                continue
+    inc_items("normalize", len(news_items), source_name)
 
-            collected_news.append(news_item)
+    apply_relevance(news_items)
+    return news_items
 
-    logger.info("Collected %s news items", len(collected_news))
-    return collected_news
 
+def news_item_to_payload(news_item: NewsItem) -> dict[str, Any]:
+    """Строка новости для передачи между задачами Celery (JSON)"""
 
-def save_news_to_db() -> int:
-    """Метод сохранения NewsItems-ов в БД"""
+    payload = news_item_to_row(news_item)
+    if payload["published_at"] is not None:
+        payload["published_at"] = payload["published_at"].isoformat()
+    return payload
 
-    db = SessionLocal()
-    saved = 0
 
-    items = collect_from_all_source()
-    logger.info("Saving %s news items to database", len(items))
+def news_item_from_payload(payload: Mapping[str, Any]) -> NewsItem:
+    news_item = NewsItem(**payload)
+    news_item.published_at = normalize_published_at(payload["published_at"])
+    return news_item
+
+
+def news_item_to_row(news_item: NewsItem) -> dict[str, Any]:
+    return {
+        column.key: getattr(news_item, column.key)
+        for column in NewsItem.__table__.columns
+    }
+
 
-    for item in items:
+def _insert_news_items_one_by_one(
+    db: Session,
+    news_items: list[NewsItem],
+) -> list[str]:
+    """Запасной путь для СУБД без INSERT ... ON CONFLICT"""
+
+    inserted_ids: list[str] = []
+
+    for news_item in news_items:
         try:
-            db.add(item)
-            db.commit()
-            saved += 1
-            logger.debug("Saved news item id=%s", item.id)
-        except Exception:
-            db.rollback()
+            with db.begin_nested():
+                db.add(news_item)
+            inserted_ids.append(news_item.id)
+        except IntegrityError:
             # новость уже есть — пропускаем
-            logger.debug(
-                "News item already exists or failed to save: id=%s",
-                item.id,
-            )
-            continue
+            logger.debug("News item already exists: id=%s", news_item.id)
+
+    return inserted_ids
+
+
+def insert_news_items(db: Session, news_items: list[NewsItem]) -> list[str]:
+    """
+    Вставка пачки новостей в рамках текущей транзакции через
+    INSERT ... ON CONFLICT DO NOTHING (SQLite, PostgreSQL).
+    Возвращает id действительно вставленных строк.
+    """
+
+    rows_by_id = {
+        news_item.id: news_item_to_row(news_item) for news_item in news_items
+    }
+    if not rows_by_id:
+        return []
+
+    dialect_name = db.get_bind().dialect.name
+
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return _insert_news_items_one_by_one(db, news_items)
+
+    stmt = (
+        insert(NewsItem)
+        .on_conflict_do_nothing(index_elements=[NewsItem.id])
+        .returning(NewsItem.id)
+    )
+    return list(db.scalars(stmt, list(rows_by_id.values())))
+
+
+def commit_list_cache(source_names: Iterable[str]) -> None:
+    """Подтверждение ETag/Last-Modified лент источников (см. LIST_CACHE_COMMIT)"""
+
+    for source_name in source_names:
+        LIST_CACHE_COMMIT[source_name]()
+
+
+def save_news_items(
+    news_items: list[NewsItem],
+    sources: Iterable[str] = (),
+) -> int:
+    """
+    Сохранение пачки новостей одной транзакцией, дубликаты пропускаются.
+    sources — источники, чьи ленты собраны в пачку целиком: их
+    ETag/Last-Modified подтверждаются после коммита.
+    """
+
+    logger.info("Saving %s news items to database", len(news_items))
+
+    if settings.dedup_enabled:
+        try:
+            with timer("dedup"):
+                mark_near_duplicates(news_items)
+        except Exception:
+            logger.exception("Near-duplicate check failed, saving as is")
+
+    db = SessionLocal()
+
+    try:
+        with timer("db_save"):
+            inserted_ids = insert_news_items(db, news_items)
+            db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Error while saving news items to database")
+        return 0
+    finally:
+        db.close()
+
+    commit_list_cache(sources)
+    inc_items("db_save", len(inserted_ids))
+
+    inserted = set(inserted_ids)
+    inserted_items = [
+        news_item for news_item in news_items if news_item.id in inserted
+    ]
+    update_watermarks(inserted_items)
+    write_through_latest(inserted_items)
+
+    try:
+        with timer("vector_append"):
+            append_news_vectors(inserted_items)
+    except Exception:
+        logger.exception("Could not append news vectors to search index")
+
+    # и новые, и уже существовавшие новости теперь точно есть в БД
+    mark_urls_seen(news_item.url for news_item in news_items)
+
+    logger.info("Saved %s new news items", len(inserted_ids))
+    return len(inserted_ids)
+
+
+def save_news_to_db() -> int:
+    """Метод сохранения NewsItems-ов в БД"""
+
+    items, completed = _collect_sources(skip_known=True)
+    return save_news_items(items, sources=completed)
+
+
+def save_source_news(source_name: str) -> int:
+    """
+    Сбор и сохранение новостей одного источника (для адаптивного опроса).
+    Ошибки источника, в том числе SourceFetchError, пробрасываются наружу.
+    """
 
-    db.close()
-    logger.info("Saved %s new news items", saved)
-    return saved
+    fetch_func = dict(SOURCE)[source_name]
+    items = collect_from_source(source_name, fetch_func, skip_known=True)
+    apply_relevance(items)
+    return save_news_items(items, sources=[source_name])
 
 
 if __name__ == "__main__":
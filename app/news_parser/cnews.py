@@ -3,15 +3,32 @@ import re
 from datetime import datetime
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
+
+from app.config import settings
+from app.metrics import inc_items, timer
+from app.news_parser.http import (
+    SourceFetchError,
+    commit_cached,
+    fetch_all,
+    fetch_page,
+    get_session,
+)
+from app.news_parser.known_urls import drop_known_items
+from app.news_parser.soup import make_soup
+from app.news_parser.watermarks import walk_pages
 
 CNEWS_NEWS_URL = "https://www.cnews.ru/news"
+CNEWS_NEWS_PAGE_URL = f"{CNEWS_NEWS_URL}/page_{{page}}"
 
 DEFAULT_HEADERS = {
     "User-Agent": "Mozilla/5.0",
     "Accept": "text/html",
 }
 
+CNEWS_LIST_STRAINER = SoupStrainer("div", class_="allnews_item")
+CNEWS_ARTICLE_STRAINER = SoupStrainer("article", class_="news_container")
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,12 +36,13 @@ def parse_cnews_article(url: str) -> str:
     """Метод забирает полный текст новости с сайта cnews, открывая для этого ссылку"""
 
     try:
-        response = requests.get(
-            url,
-            headers=DEFAULT_HEADERS,
-            timeout=(5, 15),
-        )
-        response.raise_for_status()
+        with timer("fetch_article", "cnews"):
+            response = get_session().get(
+                url,
+                headers=DEFAULT_HEADERS,
+                timeout=(5, 15),
+            )
+            response.raise_for_status()
     except requests.Timeout:
         logger.warning("CNews timeout: %s", url)
         return ""
@@ -32,7 +50,17 @@ def parse_cnews_article(url: str) -> str:
         logger.warning("CNews error %s: %s", url, exc)
         return ""
 
-    soup = BeautifulSoup(response.text, "html.parser")
+    with timer("parse_article", "cnews"):
+        summary = parse_cnews_article_html(response.text)
+    logger.debug("Parsed article summary length=%s url=%s", len(summary), url)
+
+    return summary
+
+
+def parse_cnews_article_html(html: str, backend: str | None = None) -> str:
+    """Метод извлекает полный текст новости из html страницы статьи"""
+
+    soup = make_soup(html, parse_only=CNEWS_ARTICLE_STRAINER, backend=backend)
 
     article = soup.select_one("article.news_container")
     paragraphs: list[str] = []
@@ -43,16 +71,16 @@ def parse_cnews_article(url: str) -> str:
             if text:
                 paragraphs.append(text)
 
-    summary = "\n".join(paragraphs)
-    logger.debug("Parsed article summary length=%s url=%s", len(summary), url)
-
-    return summary
+    return "\n".join(paragraphs)
 
 
-def parse_cnews_list_html(html: str) -> list[dict]:
-    """Метод извлекает требуемые части новости из html"""
+def parse_cnews_list_entries(
+    html: str,
+    backend: str | None = None,
+) -> list[dict]:
+    """Метод извлекает из html списка новостей все, кроме полного текста"""
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = make_soup(html, parse_only=CNEWS_LIST_STRAINER, backend=backend)
     news_items: list[dict] = []
 
     items = soup.select("div.allnews_item")
@@ -75,40 +103,156 @@ def parse_cnews_list_html(html: str) -> list[dict]:
                 f"{date_match.group(1)} {time_text}"
             )
 
-        summary = parse_cnews_article(url)
-
         news_items.append(
             {
                 "title": title,
                 "url": url,
                 "source": "cnews",
-                "summary": summary,
+                "summary": "",
                 "published_at": published_at,
             }
         )
 
+    return news_items
+
+
+def parse_cnews_list_html(
+    html: str,
+    limit: int | None = None,
+    skip_known: bool = False,
+) -> list[dict]:
+    """
+    Метод извлекает требуемые части новости из html.
+    При skip_known уже сохраненные в БД новости отбрасываются до того,
+    как за их полным текстом уходит HTTP-запрос. Полные тексты
+    загружаются параллельно с ограничением на хост и общим бюджетом времени.
+    """
+
+    with timer("parse", "cnews"):
+        news_items = parse_cnews_list_entries(html)[:limit]
+    inc_items("parse", len(news_items), "cnews")
+
+    return fill_cnews_summaries(news_items, skip_known=skip_known)
+
+
+def fill_cnews_summaries(
+    news_items: list[dict],
+    skip_known: bool = False,
+) -> list[dict]:
+    """
+    Загрузка полных текстов для записей списка. При skip_known уже
+    сохраненные в БД новости отбрасываются до HTTP-запроса за статьей.
+    """
+
+    if skip_known:
+        news_items = drop_known_items(news_items)
+
+    summaries = fetch_all(
+        [news_item["url"] for news_item in news_items],
+        parse_cnews_article,
+        default="",
+        max_workers=settings.article_fetch_workers,
+        per_host_limit=settings.article_fetch_per_host,
+        time_budget=settings.article_fetch_budget,
+    )
+    for news_item, summary in zip(news_items, summaries):
+        news_item["summary"] = summary
+
     logger.info("Parsed %s news items from CNews", len(news_items))
     return news_items
 
 
-def fetch_cnews_news_list(limit: int = 20) -> list[dict]:
-    """Получение коллекции сырых новостей"""
+def fetch_cnews_page_entries(page_number: int) -> list[dict]:
+    """Записи со страницы page_number ленты (со второй и дальше)"""
+
+    url = CNEWS_NEWS_PAGE_URL.format(page=page_number)
+
+    try:
+        with timer("fetch", "cnews"):
+            page = fetch_page(url, headers=DEFAULT_HEADERS, timeout=10)
+    except requests.RequestException as exc:
+        logger.warning("CNews parser error %s: %s", url, exc)
+        return []
+
+    if not page.ok:
+        logger.warning("CNews returned status code %s for %s", page.status_code, url)
+        return []
+
+    with timer("parse", "cnews"):
+        return parse_cnews_list_entries(page.text)
+
+
+def fetch_cnews_entries(
+    limit: int = 20,
+    skip_known: bool = False,
+) -> list[dict]:
+    """
+    Записи ленты без полного текста статей.
+    Сетевая ошибка или не-200 ответ ленты поднимают SourceFetchError,
+    чтобы планировщик опроса мог отложить следующий запрос.
+    Если список не изменился с прошлого запуска и нужны только новые
+    новости (skip_known), разбор пропускается. При skip_known лента
+    читается постранично до водяного знака — последней сохраненной
+    новости, а уже сохраненные в БД записи отбрасываются; без водяного
+    знака берется первая страница.
+    """
 
     logger.info("Fetching CNews news list")
 
     try:
-        response = requests.get(
-            CNEWS_NEWS_URL,
-            headers=DEFAULT_HEADERS,
-            timeout=10,
-        )
-        response.raise_for_status()
+        with timer("fetch", "cnews"):
+            page = fetch_page(
+                CNEWS_NEWS_URL,
+                headers=DEFAULT_HEADERS,
+                timeout=10,
+                conditional=skip_known,
+            )
     except requests.RequestException as exc:
         logger.warning("CNews parser error: %s", exc)
+        raise SourceFetchError("cnews", str(exc)) from exc
+
+    if not page.ok:
+        logger.warning("CNews returned status code: %s", page.status_code)
+        raise SourceFetchError(
+            "cnews",
+            f"status code {page.status_code}",
+            page.status_code,
+        )
+
+    if page.not_modified and skip_known:
+        logger.info("CNews news list not modified since last run")
         return []
 
-    items = parse_cnews_list_html(response.text)
-    return items[:limit]
+    with timer("parse", "cnews"):
+        entries = parse_cnews_list_entries(page.text)
+
+    if skip_known:
+        entries = walk_pages("cnews", entries, fetch_cnews_page_entries, limit)
+        entries = drop_known_items(entries)
+    else:
+        entries = entries[:limit]
+
+    inc_items("parse", len(entries), "cnews")
+    return entries
+
+
+def fetch_cnews_news_list(
+    limit: int = 20,
+    skip_known: bool = False,
+) -> list[dict]:
+    """
+    Получение коллекции сырых новостей вместе с полными текстами.
+    Статьи загружаются только для записей, прошедших fetch_cnews_entries.
+    """
+
+    entries = fetch_cnews_entries(limit=limit, skip_known=skip_known)
+    return fill_cnews_summaries(entries)
+
+
+def commit_cnews_news_list() -> None:
+    """ETag/Last-Modified ленты — после сохранения ее новостей в БД"""
+
+    commit_cached(CNEWS_NEWS_URL)
 
 
 if __name__ == "__main__":
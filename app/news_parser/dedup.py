@@ -0,0 +1,149 @@
+import logging
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import NewsItem
+from app.news_parser.utils import encode_texts, make_relevance_text
+
+NEWS_STATUS_DUPLICATE = "Duplicate"
+
+logger = logging.getLogger(__name__)
+
+
+def _sort_key(published_at: datetime | None) -> tuple[bool, datetime]:
+    # у Habr даты с таймзоной, у CNews — без: сравниваем без tzinfo
+    if published_at is None:
+        return True, datetime.max
+    return False, published_at.replace(tzinfo=None)
+
+
+class NearDuplicateIndex:
+    """
+    In-memory индекс нормированных эмбеддингов недавних новостей.
+    Ближайший сосед ищется одним матричным умножением.
+    """
+
+    def __init__(self, threshold: float) -> None:
+        self.threshold = threshold
+        self.ids: list[str] = []
+        self._rows: list[np.ndarray] = []
+        self._matrix: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, news_id: str, embedding: np.ndarray) -> None:
+        self.ids.append(news_id)
+        self._rows.append(embedding)
+        self._matrix = None
+
+    def find(self, news_id: str, embedding: np.ndarray) -> tuple[str, float] | None:
+        """Самая похожая новость выше порога (кроме самой себя) или None"""
+
+        if not self.ids:
+            return None
+
+        if self._matrix is None:
+            self._matrix = np.vstack(self._rows)
+
+        similarities = self._matrix @ embedding
+        for index in np.argsort(similarities)[::-1]:
+            similarity = float(similarities[index])
+            if similarity < self.threshold:
+                return None
+            if self.ids[index] != news_id:
+                return self.ids[index], similarity
+        return None
+
+
+def load_recent_index(window: timedelta, limit: int) -> NearDuplicateIndex:
+    """Индекс по релевантным неотклоненным новостям за скользящее окно"""
+
+    index = NearDuplicateIndex(settings.dedup_threshold)
+    cutoff = datetime.utcnow() - window
+
+    session = SessionLocal()
+    try:
+        rows = session.execute(
+            select(NewsItem.id, NewsItem.title, NewsItem.summary)
+            .where(
+                NewsItem.is_relevant.is_(True),
+                NewsItem.published_at >= cutoff,
+                (NewsItem.status.is_(None))
+                | (NewsItem.status != NEWS_STATUS_DUPLICATE),
+            )
+            .order_by(NewsItem.published_at.desc())
+            .limit(limit)
+        ).all()
+    finally:
+        session.close()
+
+    if rows:
+        embeddings = encode_texts(
+            [make_relevance_text(title, summary) for _, title, summary in rows]
+        )
+        for (news_id, _, _), embedding in zip(rows, embeddings):
+            index.add(news_id, embedding)
+
+    return index
+
+
+def mark_near_duplicates(news_items: list[NewsItem]) -> int:
+    """
+    Кластеризация новых релевантных новостей с недавними: копия истории,
+    уже встреченной раньше (в БД или ранее в этой пачке), получает
+    status=Duplicate и не попадает в очередь на переписывание.
+    Возвращает число помеченных новостей.
+    """
+
+    candidates = [
+        news_item
+        for news_item in news_items
+        if news_item.is_relevant and news_item.status is None
+    ]
+    if not candidates:
+        return 0
+
+    index = load_recent_index(
+        timedelta(hours=settings.dedup_window_hours),
+        settings.dedup_max_recent,
+    )
+
+    # каноническая копия — опубликованная раньше
+    candidates.sort(key=lambda news_item: _sort_key(news_item.published_at))
+    embeddings = encode_texts(
+        [
+            make_relevance_text(news_item.title, news_item.summary)
+            for news_item in candidates
+        ]
+    )
+
+    marked = 0
+    for news_item, embedding in zip(candidates, embeddings):
+        match = index.find(news_item.id, embedding)
+        if match is None:
+            index.add(news_item.id, embedding)
+            continue
+
+        canonical_id, similarity = match
+        news_item.status = NEWS_STATUS_DUPLICATE
+        marked += 1
+        logger.info(
+            "Near-duplicate news %s (%s) of %s, similarity=%.3f",
+            news_item.id,
+            news_item.source,
+            canonical_id,
+            similarity,
+        )
+
+    logger.info(
+        "Near-duplicate check: %s candidates, %s recent, %s marked",
+        len(candidates),
+        len(index) - len(candidates) + marked,
+        marked,
+    )
+    return marked
@@ -0,0 +1,194 @@
+import hashlib
+import logging
+import time
+from typing import Sequence
+
+import numpy as np
+from redis.exceptions import RedisError
+
+from app.cache import LRUCache
+from app.redis_client import get_redis_binary_client
+
+EMBEDDING_KEY_PREFIX = "emb"
+
+logger = logging.getLogger(__name__)
+
+
+def make_embedding_key(text: str) -> str:
+    """Хэш нормализованного текста новости (title + summary)"""
+
+    normalized = " ".join(text.split()).lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Двухуровневый кэш эмбеддингов:
+    — локальный LRU в памяти процесса;
+    — общий уровень в Redis (float16), переживающий рестарт воркеров.
+    В Redis размер ограничивается через sorted set с временем последнего
+    обращения: при превышении лимита удаляются самые старые записи.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        local_size: int,
+        shared_size: int,
+    ) -> None:
+        self.namespace = namespace
+        self.shared_size = shared_size
+        self.local = LRUCache(local_size)
+        self.shared_hits = 0
+        self.misses = 0
+        self._redis = None
+
+    @property
+    def index_key(self) -> str:
+        return f"{EMBEDDING_KEY_PREFIX}:{self.namespace}:index"
+
+    @property
+    def stats_key(self) -> str:
+        return f"{EMBEDDING_KEY_PREFIX}:{self.namespace}:stats"
+
+    def _value_key(self, key: str) -> str:
+        return f"{EMBEDDING_KEY_PREFIX}:{self.namespace}:{key}"
+
+    def _get_redis(self):
+        if self._redis is None:
+            self._redis = get_redis_binary_client()
+        return self._redis
+
+    def get_many(self, texts: Sequence[str]) -> list[np.ndarray | None]:
+        keys = [make_embedding_key(text) for text in texts]
+        result: list[np.ndarray | None] = [
+            self.local.get(key) for key in keys
+        ]
+        local_hits = sum(value is not None for value in result)
+
+        pending = [index for index, value in enumerate(result) if value is None]
+        shared_hits = 0
+
+        if pending and self.shared_size > 0:
+            try:
+                client = self._get_redis()
+                raw_values = client.mget(
+                    [self._value_key(keys[index]) for index in pending]
+                )
+
+                now = time.time()
+                touched: dict[str, float] = {}
+                for index, raw_value in zip(pending, raw_values):
+                    if raw_value is None:
+                        continue
+                    embedding = np.frombuffer(raw_value, dtype=np.float16)
+                    embedding = embedding.astype(np.float32)
+                    result[index] = embedding
+                    self.local.set(keys[index], embedding)
+                    touched[keys[index]] = now
+                    shared_hits += 1
+
+                if touched:
+                    client.zadd(self.index_key, touched)
+            except RedisError as exc:
+                logger.warning("Embedding cache Redis error: %s", exc)
+
+        misses = len(texts) - local_hits - shared_hits
+        self.shared_hits += shared_hits
+        self.misses += misses
+        self._push_stats(local_hits, shared_hits, misses)
+
+        logger.debug(
+            "Embedding cache lookup: local=%s shared=%s miss=%s",
+            local_hits,
+            shared_hits,
+            misses,
+        )
+        return result
+
+    def set_many(
+        self,
+        texts: Sequence[str],
+        embeddings: Sequence[np.ndarray],
+    ) -> None:
+        if not texts:
+            return
+
+        now = time.time()
+        mapping: dict[str, bytes] = {}
+        scores: dict[str, float] = {}
+
+        for text, embedding in zip(texts, embeddings):
+            key = make_embedding_key(text)
+            embedding = np.asarray(embedding, dtype=np.float32)
+            self.local.set(key, embedding)
+            mapping[self._value_key(key)] = embedding.astype(np.float16).tobytes()
+            scores[key] = now
+
+        if self.shared_size <= 0:
+            return
+
+        try:
+            client = self._get_redis()
+            pipe = client.pipeline(transaction=False)
+            pipe.mset(mapping)
+            pipe.zadd(self.index_key, scores)
+            pipe.zcard(self.index_key)
+            size = pipe.execute()[-1]
+
+            overflow = size - self.shared_size
+            if overflow > 0:
+                self._evict(client, overflow)
+        except RedisError as exc:
+            logger.warning("Embedding cache Redis error: %s", exc)
+
+    def _evict(self, client, count: int) -> None:
+        """Удаление самых давно использованных записей из Redis"""
+
+        stale = client.zrange(self.index_key, 0, count - 1)
+        if not stale:
+            return
+
+        pipe = client.pipeline(transaction=False)
+        pipe.delete(*[self._value_key(key.decode()) for key in stale])
+        pipe.zrem(self.index_key, *stale)
+        pipe.execute()
+        logger.debug("Evicted %s embeddings from shared cache", len(stale))
+
+    def _push_stats(self, local_hits: int, shared_hits: int, misses: int) -> None:
+        if self.shared_size <= 0 or not (local_hits or shared_hits or misses):
+            return
+
+        try:
+            pipe = self._get_redis().pipeline(transaction=False)
+            pipe.hincrby(self.stats_key, "local_hits", local_hits)
+            pipe.hincrby(self.stats_key, "shared_hits", shared_hits)
+            pipe.hincrby(self.stats_key, "misses", misses)
+            pipe.execute()
+        except RedisError as exc:
+            logger.debug("Could not push embedding cache stats: %s", exc)
+
+    def stats(self) -> dict[str, int]:
+        """Счетчики текущего процесса"""
+
+        return {
+            "local_size": len(self.local),
+            "local_hits": self.local.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+        }
+
+    def shared_stats(self) -> dict[str, int]:
+        """Суммарные счетчики всех процессов (из Redis)"""
+
+        try:
+            client = self._get_redis()
+            raw_stats = client.hgetall(self.stats_key)
+            shared_size = client.zcard(self.index_key)
+        except RedisError as exc:
+            logger.warning("Embedding cache Redis error: %s", exc)
+            return {}
+
+        stats = {key.decode(): int(value) for key, value in raw_stats.items()}
+        stats["shared_size"] = shared_size
+        return stats
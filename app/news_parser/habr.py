@@ -1,18 +1,26 @@
 import logging
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 
+from app.metrics import inc_items, timer
+from app.news_parser.http import SourceFetchError, commit_cached, fetch_page
+from app.news_parser.known_urls import drop_known_items
+from app.news_parser.soup import make_soup
 from app.news_parser.utils import normalize_published_at
+from app.news_parser.watermarks import walk_pages
 
 HABR_BASE_URL = "https://habr.com/ru"
 HABR_NEWS_URL = f"{HABR_BASE_URL}/news/"
+HABR_NEWS_PAGE_URL = f"{HABR_BASE_URL}/news/page{{page}}/"
 HABR_ARTICLE_URL = f"{HABR_BASE_URL}/article/"
 
 HABR_CARD_SELECTOR = "article.tm-articles-list__item"
 HABR_TITLE_SELECTOR = "a"
 HABR_TITLE_LINK_SELECTOR = "tm-title__link"
 
+HABR_CARD_STRAINER = SoupStrainer("article", class_="tm-articles-list__item")
+
 DEFAULT_HEADERS = {
     "User-Agent": "Mozilla/5.0",
     "Accept": "text/html",
@@ -21,10 +29,10 @@ DEFAULT_HEADERS = {
 logger = logging.getLogger(__name__)
 
 
-def parser_habr_list_html(html: str) -> list[dict]:
+def parser_habr_list_html(html: str, backend: str | None = None) -> list[dict]:
     """Метод извлекает требуемые части новости из html"""
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = make_soup(html, parse_only=HABR_CARD_STRAINER, backend=backend)
     news_items: list[dict] = []
 
     article_tags = soup.select(HABR_CARD_SELECTOR)
@@ -77,28 +85,85 @@ def parser_habr_list_html(html: str) -> list[dict]:
     return news_items
 
 
-def fetch_habr_news_list(limit: int = 20) -> list[dict[str, str]]:
-    """Получение коллекции сырых новостей"""
+def fetch_habr_page_items(page_number: int) -> list[dict]:
+    """Новости со страницы page_number ленты (со второй и дальше)"""
+
+    url = HABR_NEWS_PAGE_URL.format(page=page_number)
 
     try:
-        response = requests.get(
-            HABR_NEWS_URL,
-            headers=DEFAULT_HEADERS,
-            timeout=10,
-        )
+        with timer("fetch", "habr"):
+            page = fetch_page(url, headers=DEFAULT_HEADERS, timeout=10)
     except requests.RequestException as exc:
-        logger.warning("Ошибка при парсинге Habr: %s", exc)
+        logger.warning("Ошибка при парсинге Habr %s: %s", url, exc)
+        return []
+
+    if not page.ok:
+        logger.warning("Habr returned status code %s for %s", page.status_code, url)
         return []
 
-    if response.status_code != 200:
+    with timer("parse", "habr"):
+        return parser_habr_list_html(page.text)
+
+
+def fetch_habr_news_list(
+    limit: int = 20,
+    skip_known: bool = False,
+) -> list[dict[str, str]]:
+    """
+    Получение коллекции сырых новостей.
+    Сетевая ошибка или не-200 ответ ленты поднимают SourceFetchError,
+    чтобы планировщик опроса мог отложить следующий запрос.
+    Если список не изменился с прошлого запуска и нужны только новые
+    новости (skip_known), разбор страницы пропускается целиком.
+    При skip_known лента читается постранично до водяного знака —
+    последней сохраненной новости; без него берется первая страница.
+    """
+
+    try:
+        with timer("fetch", "habr"):
+            page = fetch_page(
+                HABR_NEWS_URL,
+                headers=DEFAULT_HEADERS,
+                timeout=10,
+                conditional=skip_known,
+            )
+    except requests.RequestException as exc:
+        logger.warning("Ошибка при парсинге Habr: %s", exc)
+        raise SourceFetchError("habr", str(exc)) from exc
+
+    if not page.ok:
         logger.warning(
             "Habr returned non-200 status code: %s",
-            response.status_code,
+            page.status_code,
+        )
+        raise SourceFetchError(
+            "habr",
+            f"status code {page.status_code}",
+            page.status_code,
         )
+
+    if page.not_modified and skip_known:
+        logger.info("Habr news list not modified since last run")
         return []
 
-    raw_items = parser_habr_list_html(response.text)
-    return raw_items[:limit]
+    with timer("parse", "habr"):
+        raw_items = parser_habr_list_html(page.text)
+
+    if skip_known:
+        raw_items = walk_pages("habr", raw_items, fetch_habr_page_items, limit)
+        raw_items = drop_known_items(raw_items)
+    else:
+        raw_items = raw_items[:limit]
+
+    inc_items("parse", len(raw_items), "habr")
+
+    return raw_items
+
+
+def commit_habr_news_list() -> None:
+    """ETag/Last-Modified ленты — после сохранения ее новостей в БД"""
+
+    commit_cached(HABR_NEWS_URL)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,251 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Mapping, Sequence, TypeVar
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry, make_headers
+
+from app.config import settings
+
+T = TypeVar("T")
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+logger = logging.getLogger(__name__)
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+class SourceFetchError(Exception):
+    """Ленту источника не удалось получить: сетевая ошибка или не-200 ответ"""
+
+    def __init__(self, source: str, reason: str, status_code: int | None = None):
+        super().__init__(f"{source}: {reason}")
+        self.source = source
+        self.status_code = status_code
+
+
+@dataclass
+class FetchResult:
+    status_code: int
+    text: str
+    not_modified: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code == 200 or self.not_modified
+
+
+def get_session() -> requests.Session:
+    """
+    Общая для всех парсеров HTTP-сессия: keep-alive пул соединений,
+    повторы с экспоненциальной задержкой и сжатие ответов
+    (gzip/deflate, brotli — если установлен).
+    """
+
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                retry = Retry(
+                    total=settings.http_retries,
+                    backoff_factor=settings.http_backoff_factor,
+                    status_forcelist=RETRY_STATUS_CODES,
+                    allowed_methods=frozenset({"GET", "HEAD"}),
+                    respect_retry_after_header=True,
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=settings.http_pool_connections,
+                    pool_maxsize=settings.http_pool_maxsize,
+                    max_retries=retry,
+                )
+
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update(make_headers(accept_encoding=True))
+                _session = session
+    return _session
+
+
+def _cache_path(url: str) -> str:
+    name = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return os.path.join(settings.http_cache_dir, f"{name}.json")
+
+
+def _pending_path(url: str) -> str:
+    return _cache_path(url)[:-len(".json")] + ".pending.json"
+
+
+def _load_cached(url: str) -> dict | None:
+    try:
+        with open(_cache_path(url), encoding="utf-8") as cache_file:
+            return json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+
+
+def _discard_pending(url: str) -> None:
+    try:
+        os.remove(_pending_path(url))
+    except FileNotFoundError:
+        pass
+    except OSError as exc:
+        logger.warning("Could not discard pending HTTP cache for %s: %s", url, exc)
+
+
+def _store_pending(url: str, response: requests.Response) -> None:
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if not etag and not last_modified:
+        return
+
+    path = _pending_path(url)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    try:
+        os.makedirs(settings.http_cache_dir, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as cache_file:
+            json.dump(
+                {
+                    "url": url,
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "text": response.text,
+                },
+                cache_file,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        logger.warning("Could not store HTTP cache for %s: %s", url, exc)
+
+
+def fetch_page(
+    url: str,
+    headers: Mapping[str, str] | None = None,
+    timeout: float | tuple[float, float] = 10,
+    conditional: bool = False,
+) -> FetchResult:
+    """
+    GET через общую сессию. При conditional=True отправляет
+    If-None-Match / If-Modified-Since по сохраненному на диске ответу;
+    на 304 возвращает закэшированный текст с not_modified=True.
+    Новый ответ 200 откладывается и станет основой для следующих
+    условных запросов только после commit_cached.
+    Сетевые ошибки пробрасываются как requests.RequestException.
+    """
+
+    request_headers = dict(headers or {})
+    cached = None
+    if conditional:
+        cached = _load_cached(url)
+        # отложенный ответ прошлого запуска, новости которого не сохранились
+        _discard_pending(url)
+
+    if cached:
+        if cached.get("etag"):
+            request_headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            request_headers["If-Modified-Since"] = cached["last_modified"]
+
+    response = get_session().get(url, headers=request_headers, timeout=timeout)
+
+    if response.status_code == 304 and cached:
+        logger.debug("Not modified: %s", url)
+        return FetchResult(
+            status_code=response.status_code,
+            text=cached["text"],
+            not_modified=True,
+        )
+
+    if conditional and response.status_code == 200:
+        _store_pending(url, response)
+
+    return FetchResult(status_code=response.status_code, text=response.text)
+
+
+def commit_cached(url: str) -> None:
+    """
+    Подтверждение ответа, загруженного с conditional=True: его ETag и
+    Last-Modified уйдут в следующий запрос. Вызывается после того, как
+    новости из ответа сохранены — иначе 304 скрыл бы несохраненные.
+    """
+
+    try:
+        os.replace(_pending_path(url), _cache_path(url))
+    except FileNotFoundError:
+        pass
+    except OSError as exc:
+        logger.warning("Could not commit HTTP cache for %s: %s", url, exc)
+
+
+def fetch_all(
+    urls: Sequence[str],
+    fetch: Callable[[str], T],
+    default: T,
+    max_workers: int,
+    per_host_limit: int,
+    time_budget: float,
+) -> list[T]:
+    """
+    Параллельная загрузка urls функцией fetch в пуле потоков.
+    Не больше per_host_limit одновременных запросов к одному хосту,
+    на весь список отводится time_budget секунд — не успевшие
+    загрузиться адреса получают default. Порядок результатов
+    совпадает с порядком urls.
+    """
+
+    results: list[T] = [default] * len(urls)
+    if not urls:
+        return results
+
+    host_semaphores: dict[str, threading.BoundedSemaphore] = {}
+    for url in urls:
+        host = urlsplit(url or "").netloc
+        if host not in host_semaphores:
+            host_semaphores[host] = threading.BoundedSemaphore(per_host_limit)
+
+    def fetch_limited(url: str) -> T:
+        with host_semaphores[urlsplit(url or "").netloc]:
+            return fetch(url)
+
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(urls))),
+        thread_name_prefix="fetch",
+    )
+    futures = {
+        executor.submit(fetch_limited, url): index
+        for index, url in enumerate(urls)
+    }
+
+    try:
+        done, not_done = wait(futures, timeout=time_budget)
+
+        for future in done:
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception:
+                logger.exception("Fetch failed: %s", urls[index])
+
+        if not_done:
+            logger.warning(
+                "Fetch time budget %.1fs exceeded, %s of %s urls skipped",
+                time_budget,
+                len(not_done),
+                len(urls),
+            )
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results
@@ -0,0 +1,107 @@
+import logging
+from typing import Iterable, Sequence
+
+from redis.exceptions import RedisError
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models import NewsItem
+from app.redis_client import NEWS_URL_SEEN_KEY, get_redis_client
+
+REBUILD_CHUNK_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def rebuild_seen_urls(client) -> int:
+    """Восстановление множества известных URL в Redis из таблицы news"""
+
+    session = SessionLocal()
+    rebuilt = 0
+
+    try:
+        urls = session.scalars(
+            select(NewsItem.url).where(NewsItem.url.is_not(None))
+        )
+        chunk: list[str] = []
+
+        for url in urls:
+            chunk.append(url)
+            if len(chunk) >= REBUILD_CHUNK_SIZE:
+                client.sadd(NEWS_URL_SEEN_KEY, *chunk)
+                rebuilt += len(chunk)
+                chunk = []
+
+        if chunk:
+            client.sadd(NEWS_URL_SEEN_KEY, *chunk)
+            rebuilt += len(chunk)
+    finally:
+        session.close()
+
+    logger.info("Rebuilt seen URL set from DB: %s urls", rebuilt)
+    return rebuilt
+
+
+def _known_urls_from_db(urls: Sequence[str]) -> set[str]:
+    session = SessionLocal()
+
+    try:
+        stmt = select(NewsItem.url).where(NewsItem.url.in_(urls))
+        return set(session.scalars(stmt))
+    finally:
+        session.close()
+
+
+def filter_known_urls(urls: Sequence[str]) -> set[str]:
+    """
+    Возвращает подмножество urls, которые уже сохранены в БД.
+    Основной путь — Redis set news:urls_seen, при недоступности Redis
+    проверяем напрямую по таблице news.
+    """
+
+    urls = [url for url in urls if url]
+    if not urls:
+        return set()
+
+    try:
+        client = get_redis_client()
+        if not client.exists(NEWS_URL_SEEN_KEY):
+            rebuild_seen_urls(client)
+
+        flags = client.smismember(NEWS_URL_SEEN_KEY, urls)
+        return {url for url, flag in zip(urls, flags) if flag}
+    except RedisError as exc:
+        logger.warning("Seen URL set unavailable, checking DB: %s", exc)
+
+    try:
+        return _known_urls_from_db(urls)
+    except Exception:
+        logger.exception("Could not check known URLs in DB")
+        return set()
+
+
+def drop_known_items(items: list[dict]) -> list[dict]:
+    """Отбрасывает сырые новости, URL которых уже есть в БД"""
+
+    known = filter_known_urls([item.get("url") for item in items])
+    if not known:
+        return items
+
+    fresh_items = [item for item in items if item.get("url") not in known]
+    logger.info(
+        "Skipped %s already known news items, %s left",
+        len(items) - len(fresh_items),
+        len(fresh_items),
+    )
+    return fresh_items
+
+
+def mark_urls_seen(urls: Iterable[str]) -> None:
+    urls = [url for url in urls if url]
+    if not urls:
+        return
+
+    try:
+        get_redis_client().sadd(NEWS_URL_SEEN_KEY, *urls)
+    except RedisError as exc:
+        logger.warning("Could not mark URLs as seen: %s", exc)
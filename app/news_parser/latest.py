@@ -0,0 +1,113 @@
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Iterable
+
+from redis.exceptions import RedisError
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models import NewsItem
+from app.redis_client import (
+    NEWS_LATEST_IDS_KEY,
+    NEWS_LATEST_KEY,
+    NEWS_LATEST_LIMIT,
+    get_redis_client,
+)
+
+logger = logging.getLogger(__name__)
+
+# в ленту попадают только короткие поля, полный текст остается в БД
+LATEST_FIELDS = ("id", "title", "url", "source", "published_at", "is_relevant")
+
+
+def _score(published_at: datetime | None) -> float:
+    # новости без даты в конце ленты, как и в выборке из БД (NULLS LAST)
+    if published_at is None:
+        return 0.0
+    if published_at.tzinfo is None:
+        published_at = published_at.replace(tzinfo=timezone.utc)
+    return published_at.timestamp()
+
+
+def serialize_latest(row) -> str:
+    """Компактный JSON новости для ленты: без пробелов и полного текста"""
+
+    payload = {field: getattr(row, field) for field in LATEST_FIELDS}
+    if payload["published_at"] is not None:
+        payload["published_at"] = payload["published_at"].isoformat()
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def push_latest(rows: Iterable) -> None:
+    """
+    Запись новостей в ленту последних: ZSET id -> время публикации
+    и HASH id -> JSON. Лента обрезается до NEWS_LATEST_LIMIT,
+    вытесненные записи удаляются и из HASH.
+    """
+
+    rows = list(rows)
+    if not rows:
+        return
+
+    client = get_redis_client()
+
+    pipe = client.pipeline()
+    pipe.hset(
+        NEWS_LATEST_KEY,
+        mapping={row.id: serialize_latest(row) for row in rows},
+    )
+    pipe.zadd(
+        NEWS_LATEST_IDS_KEY,
+        {row.id: _score(row.published_at) for row in rows},
+    )
+    pipe.zrange(NEWS_LATEST_IDS_KEY, 0, -NEWS_LATEST_LIMIT - 1)
+    pipe.zremrangebyrank(NEWS_LATEST_IDS_KEY, 0, -NEWS_LATEST_LIMIT - 1)
+    evicted = pipe.execute()[2]
+
+    if evicted:
+        client.hdel(NEWS_LATEST_KEY, *evicted)
+
+
+def write_through_latest(news_items: Iterable[NewsItem]) -> None:
+    """Сохраненные новости сразу попадают в ленту; ошибки Redis не критичны"""
+
+    try:
+        push_latest(news_items)
+    except RedisError as exc:
+        logger.warning("Could not update latest news feed: %s", exc)
+
+
+def read_latest(limit: int = NEWS_LATEST_LIMIT) -> list[str] | None:
+    """
+    JSON последних новостей, свежие первыми.
+    None — ленты в Redis нет и ее нужно восстановить из БД.
+    """
+
+    client = get_redis_client()
+    ids = client.zrevrange(NEWS_LATEST_IDS_KEY, 0, limit - 1)
+    if not ids:
+        return None
+
+    return [payload for payload in client.hmget(NEWS_LATEST_KEY, ids) if payload]
+
+
+def rebuild_latest(limit: int = NEWS_LATEST_LIMIT) -> list[str]:
+    """Восстановление ленты из БД; возвращает JSON первых limit новостей"""
+
+    columns = [getattr(NewsItem, field) for field in LATEST_FIELDS]
+    session = SessionLocal()
+
+    try:
+        rows = session.execute(
+            select(*columns)
+            .order_by(NewsItem.published_at.desc().nulls_last())
+            .limit(NEWS_LATEST_LIMIT)
+        ).all()
+    finally:
+        session.close()
+
+    write_through_latest(rows)
+    logger.info("Rebuilt latest news feed from DB: %s items", len(rows))
+
+    return [serialize_latest(row) for row in rows[:limit]]
@@ -0,0 +1,71 @@
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class HtmlBackend:
+    """
+    Способ разбора html: парсер BeautifulSoup и признак разбора
+    только нужных узлов через SoupStrainer.
+    """
+
+    parser: str
+    strained: bool
+
+    @property
+    def name(self) -> str:
+        return f"{self.parser}+strainer" if self.strained else self.parser
+
+
+HTML_BACKENDS = {
+    backend.name: backend
+    for backend in (
+        HtmlBackend("html.parser", strained=False),
+        HtmlBackend("html.parser", strained=True),
+    )
+}
+
+
+@lru_cache(maxsize=None)
+def get_backend(name: str | None = None) -> HtmlBackend:
+    """
+    Бэкенд по имени или из settings.html_backend.
+    auto — html.parser со SoupStrainer. lxml не предлагается: невалидную
+    разметку он чинит иначе, и текст статей расходится с html.parser.
+    """
+
+    name = name or settings.html_backend
+
+    if name == "auto":
+        return HTML_BACKENDS["html.parser+strainer"]
+
+    if name not in HTML_BACKENDS:
+        raise ValueError(f"Unknown html backend: {name}")
+
+    return HTML_BACKENDS[name]
+
+
+def make_soup(
+    html: str,
+    parse_only: SoupStrainer | None = None,
+    backend: str | None = None,
+) -> BeautifulSoup:
+    """
+    Построение дерева выбранным бэкендом. parse_only ограничивает дерево
+    нужными узлами и применяется только для бэкендов со strainer.
+    """
+
+    html_backend = get_backend(backend)
+
+    return BeautifulSoup(
+        html,
+        html_backend.parser,
+        parse_only=parse_only if html_backend.strained else None,
+    )
@@ -1,19 +1,148 @@
+import logging
+import time
 from datetime import datetime
-from typing import Any, Mapping
+from typing import Any, Sequence
 
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+import numpy as np
+
+from app.config import settings
+from app.news_parser.embedding_cache import EmbeddingCache
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "torch-int8")
+
+SIMILARITY_THRESHOLD = 0.35
+
+KEYWORDS = {
+    "python",
+    "ai", "artificial intelligence",
+    "machine learning", "ml",
+    "data science", "datascience",
+    "deep learning",
+}
+
+TOPIC_TEXT = """
+    Python programming, artificial intelligence, machine learning,
+    deep learning, data science, neural networks
+    """
+
+logger = logging.getLogger(__name__)
 
 _model = None
+_topic_embedding = None
+_embedding_cache = None
+
+
+def load_model(backend: str):
+    """
+    Загрузка MiniLM выбранным бэкендом инференса на CPU:
+    torch — исходная модель, onnx — ONNX Runtime (файл модели задается
+    settings.embedding_onnx_file, например квантованный
+    onnx/model_qint8_avx512.onnx), torch-int8 — динамическая
+    int8-квантизация линейных слоев.
+    """
+
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(MODEL_NAME, device="cpu")
+
+    if backend == "onnx":
+        model_kwargs = {}
+        if settings.embedding_onnx_file:
+            model_kwargs["file_name"] = settings.embedding_onnx_file
+        return SentenceTransformer(
+            MODEL_NAME,
+            device="cpu",
+            backend="onnx",
+            model_kwargs=model_kwargs,
+        )
+
+    if backend == "torch-int8":
+        import torch
+
+        model = SentenceTransformer(MODEL_NAME, device="cpu")
+        return torch.quantization.quantize_dynamic(
+            model,
+            {torch.nn.Linear},
+            dtype=torch.qint8,
+            inplace=True,
+        )
+
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
 
 def get_model():
     global _model
     if _model is None:
-        from sentence_transformers import SentenceTransformer
-        _model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+        started = time.perf_counter()
+        _model = load_model(settings.embedding_backend)
+        logger.info(
+            "Loaded embedding model backend=%s in %.2fs",
+            settings.embedding_backend,
+            time.perf_counter() - started,
+        )
     return _model
 
 
+def warm_up_model() -> None:
+    """Загрузка модели и эмбеддинга тематики заранее, до первого скрейпа"""
+
+    get_topic_embedding()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(
+            namespace=(
+                f"{MODEL_NAME.rsplit('/', 1)[-1]}-{settings.embedding_backend}"
+            ),
+            local_size=settings.embedding_cache_local_size,
+            shared_size=settings.embedding_cache_shared_size,
+        )
+    return _embedding_cache
+
+
+def encode_texts(texts: Sequence[str]) -> np.ndarray:
+    """
+    Нормированные эмбеддинги текстов. Попадания в кэш модель не трогают,
+    промахи кодируются одним вызовом model.encode и сохраняются в кэш.
+    """
+
+    cache = get_embedding_cache()
+    embeddings = cache.get_many(texts)
+
+    missing = [index for index, value in enumerate(embeddings) if value is None]
+    if missing:
+        encoded = get_model().encode(
+            [texts[index] for index in missing],
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+        )
+        cache.set_many([texts[index] for index in missing], encoded)
+        for index, embedding in zip(missing, encoded):
+            embeddings[index] = embedding
+
+    if not embeddings:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.vstack(embeddings).astype(np.float32, copy=False)
+
+
+def get_topic_embedding() -> np.ndarray:
+    """Нормированный эмбеддинг тематики канала, считается один раз на процесс"""
+
+    global _topic_embedding
+    if _topic_embedding is None:
+        _topic_embedding = get_model().encode(
+            TOPIC_TEXT,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+        )
+    return _topic_embedding
+
+
 def normalize_published_at(raw_value: Any) -> datetime | None:
     if isinstance(raw_value, datetime):
         return raw_value
@@ -34,44 +163,45 @@ def normalize_published_at(raw_value: Any) -> datetime | None:
                 return datetime.strptime(raw_value, possible_format)
             except ValueError:
                 continue
-        return None
+        # ISO 8601 — в том числе даты, прошедшие через JSON задач Celery
+        try:
+            return datetime.fromisoformat(raw_value)
+        except ValueError:
+            return None
     return None
 
 
-def is_relevant(title: str, summary: str) -> bool:
-    """Вычисление, является ли новость релевантной тематике нашего канала"""
+def make_relevance_text(title: str, summary: str) -> str:
+    return f"{title} {summary}".lower()
 
-    model = get_model()
 
-    SIMILARITY_THRESHOLD = 0.35
+def score_relevance(items: Sequence[tuple[str, str]]) -> list[bool]:
+    """
+    Пакетное вычисление релевантности для пар (title, summary).
+    Все тексты без ключевых слов кодируются одним пакетом (через кэш),
+    косинусная близость к тематике считается одним матричным умножением.
+    """
 
-    KEYWORDS = {
-        "python",
-        "ai", "artificial intelligence",
-        "machine learning", "ml",
-        "data science", "datascience",
-        "deep learning",
-    }
+    texts = [make_relevance_text(title, summary) for title, summary in items]
 
-    TOPIC_TEXT = """
-    Python programming, artificial intelligence, machine learning,
-    deep learning, data science, neural networks
-    """
-    TOPIC_EMBEDDING = model.encode(TOPIC_TEXT)
+    # Keyword check
+    flags = [any(keyword in text for keyword in KEYWORDS) for text in texts]
 
+    pending = [index for index, flag in enumerate(flags) if not flag]
+    if not pending:
+        return flags
 
+    # Vector similarity check
+    embeddings = encode_texts([texts[index] for index in pending])
+    similarities = embeddings @ get_topic_embedding()
 
-    text = f"{title} {summary}".lower()
+    for index, relevant in zip(pending, similarities >= SIMILARITY_THRESHOLD):
+        flags[index] = bool(relevant)
 
-    # Keyword check
-    if any(keyword in text for keyword in KEYWORDS):
-        return True
+    return flags
 
-    # Vector similarity check
-    text_embedding = model.encode(text)
-    similarity = cosine_similarity(
-        [text_embedding],
-        [TOPIC_EMBEDDING]
-    )[0][0]
 
-    return similarity >= SIMILARITY_THRESHOLD
+def is_relevant(title: str, summary: str) -> bool:
+    """Вычисление, является ли новость релевантной тематике нашего канала"""
+
+    return score_relevance([(title, summary)])[0]
@@ -0,0 +1,366 @@
+import fcntl
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Sequence
+
+import numpy as np
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import NewsItem
+from app.news_parser.utils import encode_texts, get_model, make_relevance_text
+
+VECTORS_FILE = "vectors.f16"
+IDS_FILE = "ids.txt"
+META_FILE = "meta.json"
+LOCK_FILE = ".lock"
+
+SEARCH_CHUNK_ROWS = 65_536
+
+logger = logging.getLogger(__name__)
+
+
+class IvfIndex:
+    """
+    Приближенный индекс (inverted file): k-means центроиды на выборке,
+    при поиске точно пересчитываются строки из nprobe ближайших кластеров.
+    """
+
+    def __init__(self, vectors: np.ndarray, nprobe: int, seed: int = 0) -> None:
+        rows = vectors.shape[0]
+        self.rows = rows
+        self.nprobe = nprobe
+
+        rng = np.random.default_rng(seed)
+        nlist = max(1, int(np.sqrt(rows)))
+        sample_size = min(rows, nlist * 64)
+        sample = np.asarray(
+            vectors[np.sort(rng.choice(rows, sample_size, replace=False))],
+            dtype=np.float32,
+        )
+
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)]
+        for _ in range(10):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for cluster in range(nlist):
+                members = sample[assignment == cluster]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    centroids[cluster] = centroid / max(np.linalg.norm(centroid), 1e-12)
+        self.centroids = centroids
+
+        assignment = np.empty(rows, dtype=np.int32)
+        for start in range(0, rows, SEARCH_CHUNK_ROWS):
+            chunk = np.asarray(vectors[start:start + SEARCH_CHUNK_ROWS], dtype=np.float32)
+            assignment[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+
+        order = np.argsort(assignment, kind="stable")
+        bounds = np.searchsorted(assignment[order], np.arange(nlist + 1))
+        self.lists = [order[bounds[i]:bounds[i + 1]] for i in range(nlist)]
+
+    def candidates(self, query: np.ndarray) -> np.ndarray:
+        nprobe = min(self.nprobe, len(self.lists))
+        nearest = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return np.sort(np.concatenate([self.lists[cluster] for cluster in nearest]))
+
+
+class VectorIndex:
+    """
+    Персистентная матрица float16 нормированных эмбеддингов новостей
+    (memory-mapped) и соответствие строк id новостей. Дописывается
+    инкрементально, запись между процессами сериализуется flock.
+    Поиск — векторизованное скалярное произведение; после
+    settings.vector_ann_threshold строк используется IvfIndex.
+    Он строится в фоновом потоке (build_ann), а не в запросе: пока его
+    нет, поиск точный, строки после построения досчитываются точно.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._vectors: np.ndarray | None = None
+        self._ids: list[str] = []
+        self._loaded_size = -1
+        self._ivf: IvfIndex | None = None
+        self._ann_thread: threading.Thread | None = None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(LOCK_FILE), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_dim(self) -> int | None:
+        try:
+            with open(self._path(META_FILE), encoding="utf-8") as meta_file:
+                return int(json.load(meta_file)["dim"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _align_files(self, dim: int) -> None:
+        """
+        Обрезка ids.txt и vectors.f16 до общего числа целых записей:
+        после прерванного append файлы могли разойтись, и новые строки
+        иначе сопоставились бы чужим id
+        """
+
+        try:
+            with open(self._path(IDS_FILE), "rb") as ids_file:
+                ids_data = ids_file.read()
+        except FileNotFoundError:
+            ids_data = b""
+
+        try:
+            vectors_size = os.path.getsize(self._path(VECTORS_FILE))
+        except FileNotFoundError:
+            vectors_size = 0
+
+        # недописанная последняя строка id не считается
+        complete = ids_data[:ids_data.rfind(b"\n") + 1]
+        ids_count = complete.count(b"\n")
+        rows = min(ids_count, vectors_size // (dim * 2))
+
+        ids_size = sum(len(line) + 1 for line in complete.split(b"\n")[:rows])
+        if ids_size != len(ids_data):
+            with open(self._path(IDS_FILE), "ab") as ids_file:
+                ids_file.truncate(ids_size)
+        if rows * dim * 2 != vectors_size:
+            with open(self._path(VECTORS_FILE), "ab") as vectors_file:
+                vectors_file.truncate(rows * dim * 2)
+
+        if ids_size != len(ids_data) or rows * dim * 2 != vectors_size:
+            logger.warning("Vector index files realigned to %s rows", rows)
+
+    def append(self, ids: Sequence[str], embeddings: np.ndarray) -> None:
+        if not len(ids):
+            return
+
+        embeddings = np.asarray(embeddings, dtype=np.float16)
+        dim = embeddings.shape[1]
+
+        with self._file_lock():
+            stored_dim = self._read_dim()
+            if stored_dim is None:
+                with open(self._path(META_FILE), "w", encoding="utf-8") as meta_file:
+                    json.dump({"dim": dim}, meta_file)
+            elif stored_dim != dim:
+                raise ValueError(f"Vector dim {dim} != stored dim {stored_dim}")
+
+            self._align_files(dim)
+
+            # сначала векторы, затем id: читатель берет min из двух длин,
+            # а лишние векторы без id срежет следующий append
+            with open(self._path(VECTORS_FILE), "ab") as vectors_file:
+                vectors_file.write(embeddings.tobytes())
+            with open(self._path(IDS_FILE), "a", encoding="utf-8") as ids_file:
+                ids_file.write("".join(f"{news_id}\n" for news_id in ids))
+
+        logger.debug("Appended %s vectors to index", len(ids))
+
+    def _refresh(self) -> None:
+        """Перечитывание файлов, если они выросли с прошлого раза"""
+
+        try:
+            # id дописываются после векторов — учитываем размер обоих файлов
+            size = (
+                os.path.getsize(self._path(VECTORS_FILE)),
+                os.path.getsize(self._path(IDS_FILE)),
+            )
+        except OSError:
+            self._vectors, self._ids, self._loaded_size = None, [], -1
+            self._ivf = None
+            return
+
+        if size == self._loaded_size:
+            return
+
+        dim = self._read_dim()
+        with open(self._path(IDS_FILE), encoding="utf-8") as ids_file:
+            ids_text = ids_file.read()
+        # последняя строка может быть еще недописана другим процессом
+        ids = ids_text[:ids_text.rfind("\n") + 1].splitlines()
+
+        rows = min(len(ids), size[0] // (dim * 2))
+        self._vectors = np.memmap(
+            self._path(VECTORS_FILE),
+            dtype=np.float16,
+            mode="r",
+            shape=(rows, dim),
+        )
+        self._ids = ids[:rows]
+        self._loaded_size = size
+
+        # индекс пересоздан с нуля — старый IVF ссылается на чужие строки
+        if self._ivf is not None and rows < self._ivf.rows:
+            self._ivf = None
+
+    def _ann_outdated(self) -> bool:
+        rows = len(self._ids)
+        if rows < settings.vector_ann_threshold:
+            return False
+        return self._ivf is None or rows > self._ivf.rows * 1.1
+
+    def build_ann(self) -> bool:
+        """
+        Построение IvfIndex по текущим строкам, если он нужен и устарел
+        (строк стало больше на 10%). Поиск на время построения не блокируется.
+        """
+
+        with self._lock:
+            self._refresh()
+            if not self._ann_outdated():
+                return False
+            vectors = self._vectors
+
+        logger.info("Building IVF index over %s vectors", vectors.shape[0])
+        ivf = IvfIndex(vectors, settings.vector_ann_nprobe)
+
+        with self._lock:
+            if self._ivf is None or ivf.rows > self._ivf.rows:
+                self._ivf = ivf
+        return True
+
+    def build_ann_in_background(self) -> None:
+        """Запуск build_ann в фоновом потоке, не более одного одновременно"""
+
+        with self._lock:
+            if self._ann_thread is not None and self._ann_thread.is_alive():
+                return
+            self._ann_thread = threading.Thread(
+                target=self._build_ann_safe,
+                name="vector-ann-build",
+                daemon=True,
+            )
+            self._ann_thread.start()
+
+    def _build_ann_safe(self) -> None:
+        try:
+            self.build_ann()
+        except Exception:
+            logger.exception("Failed to build IVF index")
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._ids)
+
+    def _scores(self, query: np.ndarray, rows: np.ndarray | None) -> tuple[np.ndarray, np.ndarray]:
+        if rows is not None:
+            vectors = np.asarray(self._vectors[rows], dtype=np.float32)
+            return rows, vectors @ query
+
+        total = self._vectors.shape[0]
+        scores = np.empty(total, dtype=np.float32)
+        for start in range(0, total, SEARCH_CHUNK_ROWS):
+            chunk = np.asarray(self._vectors[start:start + SEARCH_CHUNK_ROWS], dtype=np.float32)
+            scores[start:start + len(chunk)] = chunk @ query
+        return np.arange(total), scores
+
+    def search(self, query: np.ndarray, k: int) -> list[tuple[str, float]]:
+        """Top-k (id, косинусная близость) для нормированного запроса"""
+
+        query = np.asarray(query, dtype=np.float32)
+
+        with self._lock:
+            self._refresh()
+            if self._vectors is None or not len(self._ids):
+                return []
+
+            rows = None
+            if self._ivf is not None:
+                # строки, дописанные после построения, считаются точно
+                rows = np.concatenate([
+                    self._ivf.candidates(query),
+                    np.arange(self._ivf.rows, len(self._ids)),
+                ])
+
+            row_ids, scores = self._scores(query, rows)
+            ids = self._ids
+            outdated = self._ann_outdated()
+
+        if outdated:
+            self.build_ann_in_background()
+
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(ids[row_ids[index]], float(scores[index])) for index in top]
+
+
+_vector_index: VectorIndex | None = None
+
+
+def get_vector_index() -> VectorIndex:
+    global _vector_index
+    if _vector_index is None:
+        _vector_index = VectorIndex(settings.vector_index_dir)
+    return _vector_index
+
+
+def append_news_vectors(news_items: Sequence[NewsItem]) -> None:
+    """Дописывание эмбеддингов сохраненных новостей в индекс"""
+
+    if not news_items:
+        return
+
+    embeddings = encode_texts(
+        [
+            make_relevance_text(news_item.title, news_item.summary)
+            for news_item in news_items
+        ]
+    )
+    get_vector_index().append(
+        [news_item.id for news_item in news_items],
+        embeddings,
+    )
+
+
+def search_news(query: str, k: int = 10) -> list[dict]:
+    """Семантический поиск: k самых близких к запросу сохраненных новостей"""
+
+    # запросы разовые: кодируются мимо кэша эмбеддингов, чтобы не вытеснять
+    # из него тексты новостей
+    query_embedding = get_model().encode(
+        query.lower(),
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+    )
+    matches = get_vector_index().search(query_embedding, k)
+    if not matches:
+        return []
+
+    scores = dict(matches)
+    session = SessionLocal()
+
+    try:
+        rows = session.execute(
+            select(
+                NewsItem.id,
+                NewsItem.title,
+                NewsItem.url,
+                NewsItem.summary,
+                NewsItem.source,
+                NewsItem.published_at,
+                NewsItem.keywords,
+            ).where(NewsItem.id.in_(scores))
+        ).mappings().all()
+    finally:
+        session.close()
+
+    results = [dict(row, score=scores[row["id"]]) for row in rows]
+    results.sort(key=lambda result: result["score"], reverse=True)
+    return results
@@ -0,0 +1,135 @@
+import json
+import logging
+from datetime import datetime
+from typing import Callable, Iterable
+
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.models import NewsItem
+from app.redis_client import NEWS_WATERMARKS_KEY, get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+def _naive(value: datetime | None) -> datetime | None:
+    # у Habr даты с таймзоной, у CNews — без
+    return value.replace(tzinfo=None) if value is not None else None
+
+
+def get_watermark(source: str) -> dict | None:
+    """Последняя сохраненная новость источника: {"url", "published_at"}"""
+
+    try:
+        raw = get_redis_client().hget(NEWS_WATERMARKS_KEY, source)
+    except RedisError as exc:
+        logger.warning("Could not read watermark for %s: %s", source, exc)
+        return None
+
+    if not raw:
+        return None
+
+    watermark = json.loads(raw)
+    if watermark.get("published_at"):
+        watermark["published_at"] = datetime.fromisoformat(watermark["published_at"])
+    return watermark
+
+
+def update_watermarks(news_items: Iterable[NewsItem]) -> None:
+    """Водяной знак источника — самая свежая из сохраненных новостей"""
+
+    newest: dict[str, NewsItem] = {}
+    for news_item in news_items:
+        if news_item.published_at is None:
+            continue
+        current = newest.get(news_item.source)
+        if current is None or _naive(news_item.published_at) > _naive(current.published_at):
+            newest[news_item.source] = news_item
+
+    if not newest:
+        return
+
+    mapping = {
+        source: json.dumps(
+            {
+                "url": news_item.url,
+                "published_at": _naive(news_item.published_at).isoformat(),
+            }
+        )
+        for source, news_item in newest.items()
+    }
+
+    try:
+        get_redis_client().hset(NEWS_WATERMARKS_KEY, mapping=mapping)
+    except RedisError as exc:
+        logger.warning("Could not update watermarks: %s", exc)
+
+
+def cut_at_watermark(items: list[dict], watermark: dict) -> tuple[list[dict], bool]:
+    """Новости до водяного знака и признак того, что знак достигнут"""
+
+    watermark_url = watermark.get("url")
+    watermark_at = watermark.get("published_at")
+
+    for index, item in enumerate(items):
+        published_at = _naive(item.get("published_at"))
+        if item.get("url") == watermark_url:
+            return items[:index], True
+        # строго раньше: у CNews время с точностью до минуты, и несохраненная
+        # новость той же минуты иначе потерялась бы; сам знак ловит url
+        if (
+            watermark_at is not None
+            and published_at is not None
+            and published_at < watermark_at
+        ):
+            return items[:index], True
+
+    return items, False
+
+
+def walk_pages(
+    source: str,
+    first_page: list[dict],
+    fetch_page_items: Callable[[int], list[dict]],
+    limit: int,
+) -> list[dict]:
+    """
+    Обход страниц списка новостей, пока не встретится водяной знак.
+    Без водяного знака (первый запуск) берется первая страница до limit.
+    """
+
+    watermark = get_watermark(source)
+    if watermark is None:
+        return first_page[:limit]
+
+    collected: list[dict] = []
+    seen_urls: set[str] = set()
+    items = first_page
+    page = 1
+
+    while True:
+        fresh, reached = cut_at_watermark(items, watermark)
+        for item in fresh:
+            if item.get("url") not in seen_urls:
+                seen_urls.add(item.get("url"))
+                collected.append(item)
+
+        if reached:
+            break
+
+        if page >= settings.scrape_max_pages or len(collected) >= settings.scrape_max_items:
+            logger.warning(
+                "%s watermark not reached after %s pages, %s items",
+                source,
+                page,
+                len(collected),
+            )
+            break
+
+        page += 1
+        items = fetch_page_items(page)
+        if not items:
+            break
+
+    logger.info("%s: %s new items on %s page(s)", source, len(collected), page)
+    return collected[:settings.scrape_max_items]
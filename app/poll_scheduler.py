@@ -0,0 +1,138 @@
+import logging
+import time
+from typing import Iterable
+
+from app.config import settings
+from app.redis_client import NEWS_POLL_KEY, get_redis_client
+
+# вес нового наблюдения в скользящей оценке частоты новостей
+RATE_SMOOTHING = 0.3
+# предел удвоений интервала при ошибках подряд
+MAX_BACKOFF_STEPS = 6
+
+logger = logging.getLogger(__name__)
+
+
+def _state_key(source: str) -> str:
+    return f"{NEWS_POLL_KEY}:{source}"
+
+
+def _lease_key(source: str) -> str:
+    return f"{NEWS_POLL_KEY}:{source}:lease"
+
+
+def get_poll_state(source: str) -> dict:
+    """
+    Состояние опроса источника: текущий интервал (с), время следующего
+    опроса, оценка частоты новых новостей (в час) и число ошибок подряд
+    """
+
+    raw = get_redis_client().hgetall(_state_key(source))
+    return {
+        "interval": float(raw.get("interval", settings.scrape_min_interval)),
+        "next_at": float(raw.get("next_at", 0.0)),
+        "last_polled_at": float(raw.get("last_polled_at", 0.0)),
+        "rate_per_hour": float(raw.get("rate_per_hour", 0.0)),
+        "errors": int(raw.get("errors", 0)),
+        "last_new_items": int(raw.get("last_new_items", 0)),
+    }
+
+
+def claim_due_sources(
+    sources: Iterable[str],
+    now: float | None = None,
+) -> list[str]:
+    """
+    Источники, которым пора на опрос. Источник захватывается арендой
+    на scrape_max_interval, чтобы при задержке воркера диспетчер
+    не поставил его в очередь повторно.
+    """
+
+    now = time.time() if now is None else now
+    client = get_redis_client()
+    due: list[str] = []
+
+    for source in sources:
+        next_at = client.hget(_state_key(source), "next_at")
+        if next_at is not None and float(next_at) > now:
+            continue
+
+        claimed = client.set(
+            _lease_key(source),
+            now,
+            nx=True,
+            ex=settings.scrape_max_interval,
+        )
+        if claimed:
+            due.append(source)
+
+    return due
+
+
+def next_interval(
+    state: dict,
+    new_items: int,
+    failed: bool,
+    now: float,
+) -> tuple[float, float]:
+    """
+    Новый интервал опроса и оценка частоты новостей.
+    Интервал подбирается так, чтобы за опрос приходило около
+    scrape_target_new_items новостей; при ошибке — удваивается.
+    """
+
+    low = settings.scrape_min_interval
+    high = settings.scrape_max_interval
+    rate = state["rate_per_hour"]
+
+    if failed:
+        steps = min(state["errors"] + 1, MAX_BACKOFF_STEPS)
+        interval = max(state["interval"], low * 2 ** steps)
+        return min(interval, high), rate
+
+    if state["last_polled_at"]:
+        elapsed = now - state["last_polled_at"]
+    else:
+        elapsed = state["interval"]
+    observed = new_items * 3600 / max(elapsed, 1.0)
+    rate = RATE_SMOOTHING * observed + (1 - RATE_SMOOTHING) * rate
+
+    if rate > 0:
+        interval = settings.scrape_target_new_items / rate * 3600
+    else:
+        interval = state["interval"] * 2
+
+    return min(max(interval, low), high), rate
+
+
+def record_poll(source: str, new_items: int, failed: bool = False) -> float:
+    """Учет результата опроса; возвращает интервал до следующего опроса"""
+
+    now = time.time()
+    client = get_redis_client()
+    state = get_poll_state(source)
+    interval, rate = next_interval(state, new_items, failed, now)
+
+    client.hset(
+        _state_key(source),
+        mapping={
+            "interval": interval,
+            "next_at": now + interval,
+            # после ошибки частота считается от последнего успешного опроса
+            "last_polled_at": state["last_polled_at"] if failed else now,
+            "rate_per_hour": rate,
+            "errors": state["errors"] + 1 if failed else 0,
+            "last_new_items": new_items,
+        },
+    )
+    client.delete(_lease_key(source))
+
+    logger.info(
+        "Source %s polled: new=%s failed=%s rate=%.2f/h next in %.0fs",
+        source,
+        new_items,
+        failed,
+        rate,
+        interval,
+    )
+    return interval
@@ -0,0 +1,270 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import func, select, update
+
+from app.ai.google import select_next_news
+from app.ai.rewriter import get_rewriter
+from app.config import settings
+from app.database import SessionLocal
+from app.models import NewsItem, Post
+
+POST_STATUS_GENERATED = "generated"
+POST_STATUS_SENDING = "sending"
+POST_STATUS_PUBLISHED = "published"
+POST_STATUS_FAILED = "failed"
+POST_STATUS_EXPIRED = "expired"
+
+NEWS_STATUS_QUEUED = "Queued"
+NEWS_STATUS_PROCESSED = "Processed"
+NEWS_STATUS_EXPIRED = "Expired"
+
+logger = logging.getLogger(__name__)
+
+
+def _max_age_cutoff() -> datetime:
+    return datetime.utcnow() - timedelta(hours=settings.post_max_age_hours)
+
+
+def expire_stale_posts() -> int:
+    """
+    Готовые посты для новостей старше post_max_age_hours снимаются
+    с очереди, чтобы не занимать место до бесконечности
+    """
+
+    session = SessionLocal()
+
+    try:
+        stale_news = (
+            select(NewsItem.id)
+            .where(NewsItem.published_at < _max_age_cutoff())
+            .scalar_subquery()
+        )
+        stale_ids = session.scalars(
+            select(Post.news_id).where(
+                Post.status == POST_STATUS_GENERATED,
+                Post.news_id.in_(stale_news),
+            )
+        ).all()
+        if not stale_ids:
+            return 0
+
+        session.execute(
+            update(Post)
+            .where(
+                Post.status == POST_STATUS_GENERATED,
+                Post.news_id.in_(stale_ids),
+            )
+            .values(status=POST_STATUS_EXPIRED)
+        )
+        session.execute(
+            update(NewsItem)
+            .where(NewsItem.id.in_(stale_ids))
+            .values(status=NEWS_STATUS_EXPIRED)
+        )
+        session.commit()
+        logger.info("Expired %s stale generated posts", len(stale_ids))
+        return len(stale_ids)
+
+    finally:
+        session.close()
+
+
+def get_queue_depth() -> int:
+    """Количество готовых к отправке постов"""
+
+    session = SessionLocal()
+
+    try:
+        stmt = (
+            select(func.count())
+            .select_from(Post)
+            .where(Post.status == POST_STATUS_GENERATED)
+        )
+        return session.scalar(stmt) or 0
+    finally:
+        session.close()
+
+
+def _claim_news(session, news_id: str) -> bool:
+    """Помечаем новость как взятую в очередь, если ее не забрал другой воркер"""
+
+    result = session.execute(
+        update(NewsItem)
+        .where(NewsItem.id == news_id, NewsItem.status.is_(None))
+        .values(status=NEWS_STATUS_QUEUED)
+    )
+    session.commit()
+    return result.rowcount == 1
+
+
+def fill_post_queue(target: int | None = None) -> int:
+    """
+    Заранее переписываем самые свежие релевантные новости и складываем
+    их в posts со статусом generated, пока очередь не достигнет target
+    (по умолчанию settings.post_queue_depth). Возвращает число новых постов.
+    """
+
+    target = settings.post_queue_depth if target is None else target
+    expire_stale_posts()
+    missing = target - get_queue_depth()
+
+    if missing <= 0:
+        logger.info("Post queue is full: target=%s", target)
+        return 0
+
+    session = SessionLocal()
+    created = 0
+
+    try:
+        candidates = session.execute(
+            select_next_news(missing).with_only_columns(
+                NewsItem.id,
+                NewsItem.title,
+                NewsItem.summary,
+            )
+        ).all()
+
+        claimed = [
+            (news_id, f"{title}\n\n{summary}")
+            for news_id, title, summary in candidates
+            if _claim_news(session, news_id)
+        ]
+
+        try:
+            texts = get_rewriter().rewrite_many([text for _, text in claimed])
+        except Exception:
+            logger.exception("Error while rewriting queued news")
+            texts = [None] * len(claimed)
+
+        for (news_id, _), text in zip(claimed, texts):
+            if text is None:
+                # вернем новость в пул, попробуем в следующий раз
+                session.execute(
+                    update(NewsItem)
+                    .where(NewsItem.id == news_id)
+                    .values(status=None)
+                )
+                session.commit()
+                continue
+
+            session.add(
+                Post(
+                    news_id=news_id,
+                    generated_text=text,
+                    status=POST_STATUS_GENERATED,
+                )
+            )
+            session.commit()
+            created += 1
+            logger.info("Queued generated post for news_id=%s", news_id)
+
+    finally:
+        session.close()
+
+    logger.info("Generated %s posts, target depth=%s", created, target)
+    return created
+
+
+def pop_ready_post() -> Optional[Tuple[str, str, str]]:
+    """
+    Забираем из очереди готовый пост: очередь FIFO по дате новости
+    (старые первыми), иначе ранние посты никогда не уходят и занимают
+    глубину очереди. Новости старше post_max_age_hours не публикуются.
+    Возвращает (post_id, news_id, text) или None, если очередь пуста.
+    """
+
+    session = SessionLocal()
+
+    try:
+        stmt = (
+            select(Post.id, Post.news_id, Post.generated_text)
+            .join(NewsItem, NewsItem.id == Post.news_id)
+            .where(
+                Post.status == POST_STATUS_GENERATED,
+                NewsItem.published_at >= _max_age_cutoff(),
+            )
+            .order_by(NewsItem.published_at, Post.id)
+            .limit(1)
+        )
+
+        # несколько попыток на случай гонки с другим воркером
+        for _ in range(3):
+            row = session.execute(stmt).first()
+            if row is None:
+                return None
+
+            claimed = session.execute(
+                update(Post)
+                .where(
+                    Post.id == row.id,
+                    Post.status == POST_STATUS_GENERATED,
+                )
+                .values(status=POST_STATUS_SENDING)
+            )
+            session.commit()
+
+            if claimed.rowcount == 1:
+                return row.id, row.news_id, row.generated_text
+
+        return None
+
+    finally:
+        session.close()
+
+
+def mark_post_published(post_id: str, news_id: str) -> None:
+    session = SessionLocal()
+
+    try:
+        session.execute(
+            update(Post)
+            .where(Post.id == post_id)
+            .values(
+                status=POST_STATUS_PUBLISHED,
+                published_at=datetime.utcnow(),
+            )
+        )
+        session.execute(
+            update(NewsItem)
+            .where(NewsItem.id == news_id)
+            .values(status=NEWS_STATUS_PROCESSED)
+        )
+        session.commit()
+        logger.info("Post %s published for news_id=%s", post_id, news_id)
+
+    except Exception:
+        session.rollback()
+        logger.exception("Error while marking post %s as published", post_id)
+        raise
+
+    finally:
+        session.close()
+
+
+def mark_post_failed(post_id: str, news_id: str) -> None:
+    """Пост не отправлен: новость возвращается в пул для повторной попытки"""
+
+    session = SessionLocal()
+
+    try:
+        session.execute(
+            update(Post)
+            .where(Post.id == post_id)
+            .values(status=POST_STATUS_FAILED)
+        )
+        session.execute(
+            update(NewsItem)
+            .where(NewsItem.id == news_id)
+            .values(status=None)
+        )
+        session.commit()
+        logger.warning(
+            "Post %s marked as failed, news_id=%s requeued",
+            post_id,
+            news_id,
+        )
+
+    finally:
+        session.close()
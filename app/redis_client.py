@@ -3,11 +3,25 @@ from redis.exceptions import RedisError
 from app.config import settings
 
 
+NEWS_LATEST_KEY = 'news:latest'
+NEWS_URL_SEEN_KEY = 'news:urls_seen'
+NEWS_LATEST_IDS_KEY = 'news:latest_ids'
+NEWS_LATEST_LIMIT = 100
+NEWS_WATERMARKS_KEY = 'news:watermarks'
+NEWS_POLL_KEY = 'news:poll'
+
+
 def get_redis_client() -> Redis:
     client = Redis.from_url(settings.redis_url , decode_responses=True)
     return client
 
 
+def get_redis_binary_client() -> Redis:
+    """Клиент без декодирования ответов — для хранения бинарных данных"""
+    client = Redis.from_url(settings.redis_url, decode_responses=False)
+    return client
+
+
 def ping_redis() -> bool:
     try:
         client = get_redis_client()
@@ -18,4 +32,4 @@ def ping_redis() -> bool:
 
 
 if __name__ == '__main__':
-    pass
\ No newline at end of file
+    pass
@@ -46,6 +46,14 @@ class NewsItem(BaseModel):
     )
 
 
+class NewsSearchResult(NewsItem):
+    score: float = Field(
+        ...,
+        description="Cosine similarity to the query.",
+        examples=[0.73]
+    )
+
+
 class Keyword(BaseModel):
     id: int = Field(
         ...,
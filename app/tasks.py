@@ -3,19 +3,96 @@ import json
 import logging
 import asyncio
 from datetime import timedelta
+from celery import chord
+from celery.signals import task_postrun, worker_init, worker_process_init
 from app.celery_app import celery_app
 from app.config import settings
-from app.news_parser import save_news_to_db
-from app.redis_client import get_redis_client
+from app.database import engine, init_db
+from app.metrics import flush_to_redis
+from app.news_parser import (
+    ARTICLE_SOURCE,
+    SOURCE,
+    build_news_items,
+    commit_list_cache,
+    fetch_source_articles,
+    fetch_source_entries,
+    news_item_from_payload,
+    news_item_to_payload,
+    save_news_items,
+    save_news_to_db,
+    save_source_news,
+)
+from app.news_parser.http import SourceFetchError
+from app.news_parser.utils import warm_up_model
+from app.poll_scheduler import claim_due_sources, record_poll
+from app.post_queue import fill_post_queue
+from app.redis_client import (
+    NEWS_LATEST_IDS_KEY,
+    NEWS_LATEST_KEY,
+    NEWS_LATEST_LIMIT,
+    NEWS_URL_SEEN_KEY,
+    get_redis_client,
+)
+from app.telegram.publisher import make_post_service
 
 
-NEWS_LATEST_KEY = 'news:latest'
-NEWS_URL_SEEN_KEY = 'news:urls_seen'
-NEWS_LATEST_IDS_KEY = 'news:latest_ids'
-NEWS_LATEST_LIMIT = 100
+logger = logging.getLogger(__name__)
 
+# идемпотентные шаги сбора подтверждаются после выполнения: при падении
+# воркера задача вернется в очередь. make_post сюда не входит — повтор
+# после отправки в Telegram продублировал бы пост
+IDEMPOTENT_TASK_OPTIONS = {"acks_late": True, "reject_on_worker_lost": True}
 
-logger = logging.getLogger(__name__)
+_event_loop: asyncio.AbstractEventLoop | None = None
+
+
+def run_async(coro):
+    """
+    Выполнение корутины в постоянном цикле событий процесса воркера:
+    так долгоживущий Telegram-клиент переживает вызовы задач.
+    """
+
+    global _event_loop
+    if _event_loop is None or _event_loop.is_closed():
+        _event_loop = asyncio.new_event_loop()
+    return _event_loop.run_until_complete(coro)
+
+
+@worker_init.connect
+def init_database(**kwargs):
+    """
+    Воркеры в отдельных контейнерах делят одну БД: таблицы создает
+    первый запущенный, если API еще не стартовал
+    """
+    try:
+        init_db()
+    except Exception:
+        # параллельный старт нескольких воркеров: таблицы уже создал другой
+        logger.exception("Database init failed")
+
+
+@worker_process_init.connect
+def reset_db_pool(**kwargs):
+    """Соединения, унаследованные от родителя при fork, не переиспользуются"""
+    engine.dispose(close=False)
+
+
+@worker_process_init.connect
+def warm_up_worker(**kwargs):
+    """Модель релевантности загружается при старте процесса воркера"""
+    if not settings.embedding_warmup:
+        return
+
+    try:
+        warm_up_model()
+    except Exception:
+        logger.exception("Embedding model warm-up failed")
+
+
+@task_postrun.connect
+def push_metrics(**kwargs):
+    """Метрики воркера агрегируются в Redis после каждой задачи"""
+    flush_to_redis()
 
 
 @celery_app.task(name="app.tasks.ping")
@@ -23,11 +100,127 @@ def ping():
     return True
 
 
-@celery_app.task(name="app.tasks.scrape_news_and_save")
-def scrape_news_and_save():
-    return save_news_to_db()
+@celery_app.task(
+    name="app.tasks.scrape_news_and_save",
+    bind=True,
+    **IDEMPOTENT_TASK_OPTIONS,
+)
+def scrape_news_and_save(self):
+    """
+    Сбор всех источников; результат — число новых новостей.
+    В режиме конвейера задача заменяется конвейерами по источникам,
+    их результаты складывает sum_counts.
+    """
+    if not settings.scrape_pipeline:
+        return save_news_to_db()
+
+    return self.replace(
+        chord(
+            (scrape_source.si(source_name) for source_name, _ in SOURCE),
+            sum_counts.s(),
+        )
+    )
+
+
+@celery_app.task(name="app.tasks.sum_counts")
+def sum_counts(counts: list[int]):
+    return sum(counts)
+
+
+@celery_app.task(name="app.tasks.dispatch_source_scrapes")
+def dispatch_source_scrapes():
+    """Постановка в очередь опроса источников, у которых подошел срок"""
+    due = claim_due_sources(source_name for source_name, _ in SOURCE)
+    for source_name in due:
+        scrape_source.delay(source_name)
+    return due
+
+
+@celery_app.task(
+    name="app.tasks.scrape_source",
+    bind=True,
+    **IDEMPOTENT_TASK_OPTIONS,
+)
+def scrape_source(self, source_name: str):
+    """
+    Конвейер одного источника: список (io) -> статьи пачкой (io) ->
+    эмбеддинги и релевантность пачкой (cpu) -> сохранение (cpu).
+    Без scrape_pipeline источник обрабатывается целиком в этой задаче.
+    """
+    if not settings.scrape_pipeline:
+        return _scrape_source_inline(source_name)
+
+    try:
+        raw_items = fetch_source_entries(source_name)
+    except SourceFetchError as exc:
+        logger.warning("Source %s unavailable: %s", source_name, exc)
+        record_poll(source_name, 0, failed=True)
+        return 0
+    except Exception:
+        logger.exception("Ошибка при парсинге новостей из источника %s", source_name)
+        record_poll(source_name, 0, failed=True)
+        return 0
+
+    if not raw_items:
+        # новых новостей нет — сохранять нечего, лента обработана
+        commit_list_cache([source_name])
+        record_poll(source_name, 0)
+        return 0
+
+    if source_name in ARTICLE_SOURCE:
+        workflow = fetch_articles.s(raw_items, source_name) | score_news.s(source_name)
+    else:
+        workflow = score_news.s(raw_items, source_name)
+
+    return self.replace(workflow | save_news_batch.s(source_name))
+
+
+def _scrape_source_inline(source_name: str) -> int:
+    try:
+        inserted = save_source_news(source_name)
+    except SourceFetchError as exc:
+        logger.warning("Source %s unavailable: %s", source_name, exc)
+        record_poll(source_name, 0, failed=True)
+        return 0
+    except Exception:
+        logger.exception("Ошибка при парсинге новостей из источника %s", source_name)
+        record_poll(source_name, 0, failed=True)
+        return 0
+
+    record_poll(source_name, inserted)
+    return inserted
+
+
+@celery_app.task(name="app.tasks.fetch_articles", **IDEMPOTENT_TASK_OPTIONS)
+def fetch_articles(raw_items: list[dict], source_name: str):
+    """
+    Статьи источника одной задачей: fetch_all держит лимит соединений
+    на хост и общий бюджет времени, которые не работают при задаче
+    на каждую статью
+    """
+    return fetch_source_articles(source_name, raw_items)
+
+
+@celery_app.task(name="app.tasks.score_news", **IDEMPOTENT_TASK_OPTIONS)
+def score_news(raw_items: list[dict], source_name: str):
+    """Нормализация и пакетная оценка релевантности новостей источника"""
+    news_items = build_news_items(source_name, raw_items)
+    return [news_item_to_payload(news_item) for news_item in news_items]
+
+
+@celery_app.task(name="app.tasks.save_news_batch", **IDEMPOTENT_TASK_OPTIONS)
+def save_news_batch(payloads: list[dict], source_name: str):
+    news_items = [news_item_from_payload(payload) for payload in payloads]
+    inserted = save_news_items(news_items, sources=[source_name])
+    record_poll(source_name, inserted)
+    return inserted
 
 
 @celery_app.task(name="app.tasks.make_post")
 def make_post():
-    return asyncio.run(make_post_service())
\ No newline at end of file
+    return run_async(make_post_service())
+
+
+@celery_app.task(name="app.tasks.fill_post_queue")
+def fill_post_queue_task():
+    return fill_post_queue()
@@ -1,33 +1,199 @@
-import os
-from telethon import TelegramClient
-from dotenv import load_dotenv
-from app.ai.google import take_last_post_and_rewrite
-from app.utils import publish_post_to_db
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Sequence
+
+from app.config import settings
+from app.metrics import inc_items, timer
+from app.post_queue import mark_post_failed, mark_post_published, pop_ready_post
+
+if TYPE_CHECKING:
+    from telethon import TelegramClient
+
+logger = logging.getLogger(__name__)
+
+
+class TelegramPublisher:
+    """
+    Один подключенный TelegramClient на процесс воркера.
+    Подключение выполняется лениво и восстанавливается при обрыве,
+    FloodWait обрабатывается ожиданием, несколько сообщений и каналов
+    отправляются параллельно через одно соединение.
+    """
+
+    def __init__(
+        self,
+        api_id: int,
+        api_hash: str,
+        session_name: str = "session",
+        max_retries: int = 3,
+        max_flood_wait: int = 300,
+        backoff: float = 1.0,
+    ) -> None:
+        self.api_id = api_id
+        self.api_hash = api_hash
+        self.session_name = session_name
+        self.max_retries = max_retries
+        self.max_flood_wait = max_flood_wait
+        self.backoff = backoff
+        self._client: "TelegramClient | None" = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock: asyncio.Lock | None = None
+
+    async def get_client(self) -> "TelegramClient":
+        # telethon импортируется лениво: API и beat его не используют
+        from telethon import TelegramClient
+
+        loop = asyncio.get_running_loop()
+
+        if self._loop is not loop:
+            # клиент telethon привязан к циклу событий, в котором создан
+            self._client = None
+            self._lock = asyncio.Lock()
+            self._loop = loop
+
+        async with self._lock:
+            if self._client is None:
+                self._client = TelegramClient(
+                    self.session_name,
+                    self.api_id,
+                    self.api_hash,
+                )
+
+            if not self._client.is_connected():
+                logger.info("Connecting Telegram client")
+                await self._client.start()
+
+        return self._client
+
+    async def disconnect(self) -> None:
+        client = self._client
+        self._client = None
+
+        if client is not None and client.is_connected():
+            try:
+                await client.disconnect()
+            except Exception:
+                logger.debug("Error while disconnecting Telegram client")
+
+    async def send(self, channel_id: int | str, message: str) -> None:
+        from telethon.errors import FloodWaitError
+
+        for attempt in range(self.max_retries + 1):
+            client = await self.get_client()
+
+            try:
+                with timer("telegram_send"):
+                    await client.send_message(channel_id, message)
+                inc_items("telegram_send", 1)
+                return
+
+            except FloodWaitError as exc:
+                if attempt == self.max_retries or exc.seconds > self.max_flood_wait:
+                    raise
+                logger.warning(
+                    "Telegram flood wait %ss for channel %s",
+                    exc.seconds,
+                    channel_id,
+                )
+                await asyncio.sleep(exc.seconds + 1)
+
+            except OSError as exc:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff * 2 ** attempt
+                logger.warning(
+                    "Telegram connection error, reconnecting in %.1fs: %s",
+                    delay,
+                    exc,
+                )
+                await self.disconnect()
+                await asyncio.sleep(delay)
+
+    async def send_many(
+        self,
+        messages: Sequence[str],
+        channel_ids: Sequence[int | str],
+    ) -> list[BaseException | None]:
+        """
+        Параллельная отправка всех сообщений во все каналы.
+        Возвращает ошибки в порядке (сообщение, канал), None — успех.
+        """
+
+        results = await asyncio.gather(
+            *(
+                self.send(channel_id, message)
+                for message in messages
+                for channel_id in channel_ids
+            ),
+            return_exceptions=True,
+        )
+        return [
+            result if isinstance(result, BaseException) else None
+            for result in results
+        ]
+
+
+_publisher: TelegramPublisher | None = None
+
+
+def get_publisher() -> TelegramPublisher:
+    global _publisher
+    if _publisher is None:
+        _publisher = TelegramPublisher(
+            api_id=settings.telegram_api_id,
+            api_hash=settings.telegram_api_hash,
+            session_name=settings.telegram_session,
+            max_retries=settings.telegram_send_retries,
+            max_flood_wait=settings.telegram_max_flood_wait,
+        )
+    return _publisher
+
 
 async def send_message(message: str) -> str:
-    """Отправка поста в Телеграмм канал"""
+    """Отправка поста во все настроенные Телеграмм каналы"""
 
-    load_dotenv()
+    if not settings.telegram_channel_ids:
+        raise ValueError("No Telegram channels configured (TELEGRAM_CHANNEL_ID)")
 
-    api_id = int(os.getenv("telegram_api_id"))
-    api_hash = os.getenv("telegram_api_hash")
-    channel_id = int(os.getenv("telegram_channel_id"))
+    errors = await get_publisher().send_many(
+        [message],
+        settings.telegram_channel_ids,
+    )
 
-    client = TelegramClient("session", api_id, api_hash)
+    failed = [error for error in errors if error is not None]
+    if failed and len(failed) == len(errors):
+        raise failed[0]
 
-    async with client:
-        await client.send_message(channel_id, message)
+    for error in failed:
+        logger.error("Failed to send message to one of channels: %r", error)
 
     return "done"
 
 
 async def make_post_service() -> bool:
-    result = take_last_post_and_rewrite()
-    if not result:
+    """
+    Отправка заранее сгенерированного поста из очереди.
+    Переписывание нейросетью выполняет задача fill_post_queue.
+    """
+
+    if not settings.telegram_channel_ids:
+        # пост не забираем из очереди: отправлять его некуда
+        logger.error("No Telegram channels configured, skipping post")
         return False
 
-    news_id, text = result
-    status_result = await send_message(text)
-    publish_post_to_db(news_id, text)
+    post = pop_ready_post()
+    if not post:
+        logger.info("No generated posts in queue")
+        return False
+
+    post_id, news_id, text = post
+
+    try:
+        status_result = await send_message(text)
+    except Exception:
+        mark_post_failed(post_id, news_id)
+        raise
+
+    mark_post_published(post_id, news_id)
 
-    return bool(status_result)
\ No newline at end of file
+    return bool(status_result)
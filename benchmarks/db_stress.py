@@ -0,0 +1,217 @@
+"""
+Нагрузочный тест конкурентного доступа к БД.
+
+Несколько процессов (как API, beat и воркеры) с несколькими потоками
+одновременно пишут новости пачками, забирают их в очередь постов
+(SELECT, затем UPDATE и INSERT) и листают /news/.
+Считаются операции и ошибки "database is locked"; код возврата 1 —
+если ошибки были. --legacy создает движок по-старому (только
+check_same_thread=False) для сравнения.
+
+    python -m benchmarks.db_stress [--processes 12] [--threads 6] [--seconds 15] [--legacy]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+
+OPERATIONS = ("write", "claim", "read")
+
+
+def configure_legacy_engine() -> None:
+    from sqlalchemy import create_engine
+
+    from app import database
+    from app.config import settings
+
+    database.engine = create_engine(
+        settings.DATABASE_URL,
+        connect_args={"check_same_thread": False},
+    )
+    database.SessionLocal.configure(bind=database.engine)
+
+
+def write_batch(rng: random.Random, batch: int) -> None:
+    from app.database import SessionLocal
+    from app.models import NewsItem
+    from app.news_parser import insert_news_items
+
+    now = datetime.utcnow()
+    news_items = [
+        NewsItem(
+            id=uuid.uuid4().hex,
+            title=f"Stress news {rng.random()}",
+            url=f"https://example.com/{uuid.uuid4().hex}",
+            summary="x" * 500,
+            source=rng.choice(("habr", "cnews")),
+            published_at=now - timedelta(seconds=rng.randint(0, 3600)),
+            keywords="",
+            is_relevant=rng.random() < 0.5,
+        )
+        for _ in range(batch)
+    ]
+
+    session = SessionLocal()
+    try:
+        insert_news_items(session, news_items)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def claim_one() -> None:
+    from sqlalchemy import select, update
+
+    from app.database import SessionLocal
+    from app.models import NewsItem, Post
+
+    session = SessionLocal()
+    try:
+        news_id = session.scalar(
+            select(NewsItem.id)
+            .where(NewsItem.is_relevant.is_(True), NewsItem.status.is_(None))
+            .order_by(NewsItem.published_at.desc())
+            .limit(1)
+        )
+        if news_id is None:
+            session.rollback()
+            return
+
+        result = session.execute(
+            update(NewsItem)
+            .where(NewsItem.id == news_id, NewsItem.status.is_(None))
+            .values(status="Queued")
+        )
+        if result.rowcount == 1:
+            session.add(
+                Post(news_id=news_id, generated_text="stress", status="generated")
+            )
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def read_pages(pages: int) -> None:
+    from app.listing import list_news
+
+    cursor = None
+    for _ in range(pages):
+        page = list_news(cursor=cursor, limit=50)
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+
+def run_thread(seed: int, deadline: float, args, counters: Counter, lock) -> None:
+    from sqlalchemy.exc import OperationalError
+
+    rng = random.Random(seed)
+    local: Counter = Counter()
+
+    while time.monotonic() < deadline:
+        operation = rng.choice(OPERATIONS)
+        try:
+            if operation == "write":
+                write_batch(rng, args.batch)
+            elif operation == "claim":
+                claim_one()
+            else:
+                read_pages(3)
+            local[operation] += 1
+        except OperationalError as exc:
+            key = "locked" if "locked" in str(exc) else "operational"
+            local[key] += 1
+
+    with lock:
+        counters.update(local)
+
+
+def run_process(index: int, args, queue) -> None:
+    if args.legacy:
+        configure_legacy_engine()
+
+    counters: Counter = Counter()
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.seconds
+    threads = [
+        threading.Thread(
+            target=run_thread,
+            args=(index * 1000 + number, deadline, args, counters, lock),
+        )
+        for number in range(args.threads)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    queue.put(dict(counters))
+
+
+def main(argv: list[str] | None = None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--processes", type=int, default=12)
+    arg_parser.add_argument("--threads", type=int, default=6)
+    arg_parser.add_argument("--seconds", type=float, default=15.0)
+    arg_parser.add_argument("--batch", type=int, default=500, help="новостей в пачке записи")
+    arg_parser.add_argument("--database-url", help="по умолчанию временный SQLite-файл")
+    arg_parser.add_argument("--legacy", action="store_true", help="движок без настроек")
+    args = arg_parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="newsbot-db-stress-")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{workdir}/stress.db"
+
+    from app.database import init_db
+
+    init_db()
+
+    # spawn: каждый процесс создает свой движок, как отдельные сервисы
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    processes = [
+        context.Process(target=run_process, args=(index, args, queue))
+        for index in range(args.processes)
+    ]
+
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+
+    totals: Counter = Counter()
+    for _ in processes:
+        totals.update(queue.get())
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    operations = sum(totals[operation] for operation in OPERATIONS)
+    errors = totals["locked"] + totals["operational"]
+
+    print(
+        f"engine={'legacy' if args.legacy else 'tuned'} "
+        f"processes={args.processes} threads={args.threads} seconds={elapsed:.1f}"
+    )
+    for operation in OPERATIONS:
+        print(f"{operation:<6} {totals[operation]:>8} {totals[operation] / elapsed:>9.1f}/s")
+    print(f"locked errors: {totals['locked']}, other operational errors: {totals['operational']}")
+    print(f"total ops: {operations}, error rate: {errors / max(operations + errors, 1):.2%}")
+
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
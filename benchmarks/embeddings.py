@@ -0,0 +1,144 @@
+"""
+Сравнение бэкендов инференса модели релевантности (torch / onnx / torch-int8).
+
+Каждый бэкенд запускается в отдельном процессе: время загрузки, пиковый
+RSS, латентность пакетного encode и сходство с тематикой для набора
+текстов. Решения о релевантности сравниваются с torch: расхождения
+допустимы только в полосе --tolerance вокруг порога.
+
+    python -m benchmarks.embeddings [--backends torch,onnx] [--batch 64]
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.fixtures import STORIES, WORDS
+
+REFERENCE_BACKEND = "torch"
+
+
+def make_texts(count: int) -> list[str]:
+    rng = random.Random(0)
+    texts = []
+    for index in range(count):
+        title, _ = STORIES[index % len(STORIES)]
+        summary = " ".join(rng.choice(WORDS) for _ in range(40))
+        texts.append(f"{title} {summary}".lower())
+    return texts
+
+
+def run_worker(backend: str, count: int, batch: int, repeat: int) -> dict:
+    os.environ["EMBEDDING_BACKEND"] = backend
+
+    from app.news_parser.utils import TOPIC_TEXT, load_model
+
+    texts = make_texts(count)
+
+    started = time.perf_counter()
+    model = load_model(backend)
+    load_s = time.perf_counter() - started
+
+    topic = model.encode(TOPIC_TEXT, normalize_embeddings=True, convert_to_numpy=True)
+    model.encode(texts[:batch], normalize_embeddings=True)  # прогрев
+
+    latencies = []
+    for _ in range(repeat):
+        for start in range(0, count, batch):
+            chunk = texts[start:start + batch]
+            chunk_started = time.perf_counter()
+            model.encode(chunk, normalize_embeddings=True, convert_to_numpy=True)
+            latencies.append(time.perf_counter() - chunk_started)
+
+    embeddings = model.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+    similarities = (embeddings @ topic).tolist()
+
+    return {
+        "load_s": load_s,
+        "batch_p50_ms": statistics.median(latencies) * 1000,
+        "texts_per_s": count * repeat / sum(latencies),
+        "rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "similarities": similarities,
+    }
+
+
+def spawn(backend: str, args) -> dict:
+    completed = subprocess.run(
+        [
+            sys.executable, "-m", "benchmarks.embeddings",
+            "--worker", backend,
+            "--count", str(args.count),
+            "--batch", str(args.batch),
+            "--repeat", str(args.repeat),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv: list[str] | None = None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--backends", default="torch,onnx,torch-int8")
+    arg_parser.add_argument("--count", type=int, default=256)
+    arg_parser.add_argument("--batch", type=int, default=64)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--tolerance", type=float, default=0.02)
+    arg_parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = arg_parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.count, args.batch, args.repeat)))
+        return 0
+
+    from app.news_parser.utils import SIMILARITY_THRESHOLD
+
+    backends = args.backends.split(",")
+    if REFERENCE_BACKEND not in backends:
+        backends.insert(0, REFERENCE_BACKEND)
+
+    results = {backend: spawn(backend, args) for backend in backends}
+    reference = results[REFERENCE_BACKEND].get("similarities")
+    failed = False
+
+    print(
+        f"{'backend':<12} {'load s':>7} {'batch p50 ms':>13} {'texts/s':>9} "
+        f"{'RSS MiB':>8} {'max |Δsim|':>11} {'flips':>6}"
+    )
+    for backend, result in results.items():
+        if "error" in result:
+            print(f"{backend:<12} error: {result['error']}")
+            failed |= backend == REFERENCE_BACKEND
+            continue
+
+        max_delta = 0.0
+        flips = 0
+        if reference:
+            for base, other in zip(reference, result["similarities"]):
+                max_delta = max(max_delta, abs(base - other))
+                decision_differs = (base >= SIMILARITY_THRESHOLD) != (
+                    other >= SIMILARITY_THRESHOLD
+                )
+                if decision_differs and abs(base - SIMILARITY_THRESHOLD) > args.tolerance:
+                    flips += 1
+
+        failed |= flips > 0
+        print(
+            f"{backend:<12} {result['load_s']:>7.2f} {result['batch_p50_ms']:>13.1f} "
+            f"{result['texts_per_s']:>9.1f} {result['rss_mib']:>8.0f} "
+            f"{max_delta:>11.4f} {flips:>6}"
+        )
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
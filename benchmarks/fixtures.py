@@ -0,0 +1,213 @@
+"""
+HTML-фикстуры Habr/CNews для офлайн-бенчмарков.
+
+Если в каталоге фикстур лежат сохраненные страницы (habr_list*.html,
+cnews_list*.html, cnews_article*.html), используются они. Иначе страницы
+генерируются детерминированно по разметке, которую ждут парсеры.
+"""
+
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+
+FIXTURE_KINDS = ("habr_list", "cnews_list", "cnews_article")
+
+# время первой новости; каждая следующая на минуту позже
+FIXTURE_START = datetime(2025, 12, 16)
+
+STORIES = [
+    ("Вышел Python 3.14 с новым сборщиком мусора", "python"),
+    ("Google представила новую модель машинного обучения Gemini", "ai"),
+    ("Минцифры расширило список отечественного ПО", "other"),
+    ("Исследователи ускорили обучение нейросетей на CPU", "ai"),
+    ("Сбер открыл исходный код библиотеки для data science", "python"),
+    ("Цены на смартфоны выросли на 15% за квартал", "other"),
+    ("Яндекс выпустил открытую LLM для разработчиков", "ai"),
+    ("В России выросли продажи ноутбуков", "other"),
+    ("PyTorch 3.0 получил компилятор для мобильных устройств", "python"),
+    ("Операторы связи тестируют 5G в новых регионах", "other"),
+]
+
+WORDS = (
+    "разработчики компания релиз версия система данные модель сервис "
+    "пользователи рынок проект платформа обновление исследование сеть "
+    "инфраструктура облако безопасность производительность приложение"
+).split()
+
+
+def _sentence(rng: random.Random, length: int = 14) -> str:
+    words = [rng.choice(WORDS) for _ in range(length)]
+    return " ".join(words).capitalize() + "."
+
+
+def _noise(rng: random.Random, blocks: int) -> str:
+    """Навигация, скрипты и прочая разметка вокруг полезных узлов"""
+
+    parts = []
+    for index in range(blocks):
+        links = "".join(
+            f'<li class="nav-item"><a href="/hub/{index}-{link}/">'
+            f"{rng.choice(WORDS)}</a></li>"
+            for link in range(12)
+        )
+        parts.append(
+            f'<nav class="menu-{index}"><ul>{links}</ul></nav>'
+            f"<script>window.__state_{index} = "
+            f'{{"items": [{",".join(str(rng.random()) for _ in range(40))}]}};'
+            "</script>"
+            f'<aside class="sidebar"><p>{_sentence(rng, 30)}</p></aside>'
+        )
+    return "\n".join(parts)
+
+
+def story(index: int) -> tuple[str, str]:
+    title, topic = STORIES[index % len(STORIES)]
+    if index >= len(STORIES):
+        title = f"{title} (часть {index // len(STORIES) + 1})"
+    return title, topic
+
+
+def published_at(index: int) -> datetime:
+    """
+    Время публикации новости index: растет вместе с индексом, с точностью
+    до минуты, как у CNews, — водяные знаки видят ленту как настоящую
+    """
+
+    return FIXTURE_START + timedelta(minutes=index)
+
+
+def make_habr_list_html(count: int = 20, seed: int = 0, offset: int = 0) -> str:
+    """Новости offset..offset+count-1, свежие первыми, как в ленте"""
+
+    rng = random.Random(seed)
+    cards = []
+
+    for index in reversed(range(offset, offset + count)):
+        title, _ = story(index)
+        moment = published_at(index)
+        cards.append(
+            '<article class="tm-articles-list__item" id="'
+            f'{900000 + index}">'
+            '<div class="tm-article-snippet">'
+            '<span class="tm-article-snippet__meta">'
+            f'<time datetime="{moment:%Y-%m-%dT%H:%M}:00.000Z" '
+            f'title="{moment:%Y-%m-%d, %H:%M}">сегодня</time></span>'
+            '<h2 class="tm-title tm-title_h2">'
+            f'<a href="/ru/news/{900000 + index}/" class="tm-title__link">'
+            f"<span>{title}</span></a></h2>"
+            '<div class="tm-article-body">'
+            f"<p>{title}. {_sentence(rng)} {_sentence(rng)}</p></div>"
+            f"{_noise(rng, 1)}"
+            "</div></article>"
+        )
+
+    return (
+        "<!DOCTYPE html><html><head><title>Новости / Хабр</title></head><body>"
+        f"{_noise(rng, 6)}"
+        '<div class="tm-articles-list">'
+        f"{''.join(cards)}"
+        "</div>"
+        f"{_noise(rng, 4)}"
+        "</body></html>"
+    )
+
+
+def cnews_article_url(index: int, base_url: str = "https://www.cnews.ru") -> str:
+    return f"{base_url}/news/top/{published_at(index):%Y-%m-%d}_novost_{index}"
+
+
+def make_cnews_list_html(
+    count: int = 20,
+    seed: int = 0,
+    base_url: str = "https://www.cnews.ru",
+    offset: int = 0,
+) -> str:
+    """Новости offset..offset+count-1, свежие первыми, как в ленте"""
+
+    rng = random.Random(seed)
+    items = []
+
+    for index in reversed(range(offset, offset + count)):
+        title, _ = story(index)
+        moment = published_at(index)
+        items.append(
+            '<div class="allnews_item">'
+            f'<div class="ani-date"><time>{moment:%d.%m.%Y}</time>'
+            f"<time>{moment:%H:%M}</time></div>"
+            f'<a class="ani-postname" href="{cnews_article_url(index, base_url)}">'
+            f"{title}</a>"
+            f'<span class="ani-tag">{rng.choice(WORDS)}</span>'
+            "</div>"
+        )
+
+    return (
+        "<!DOCTYPE html><html><head><title>CNews</title></head><body>"
+        f"{_noise(rng, 8)}"
+        f'<div class="allnews">{"".join(items)}</div>'
+        f"{_noise(rng, 4)}"
+        "</body></html>"
+    )
+
+
+def make_cnews_article_html(index: int = 0, paragraphs: int = 8) -> str:
+    rng = random.Random(index)
+    title, _ = story(index)
+    body = "".join(
+        f"<p>{_sentence(rng, 25)} {_sentence(rng, 25)}</p>"
+        for _ in range(paragraphs)
+    )
+
+    return (
+        f"<!DOCTYPE html><html><head><title>{title}</title></head><body>"
+        f"{_noise(rng, 8)}"
+        '<article class="news_container">'
+        f"<h1>{title}</h1><p>{title}. {_sentence(rng)}</p>{body}"
+        '<div class="news_tags"><p>Теги не входят в текст</p></div>'
+        "</article>"
+        f"{_noise(rng, 4)}"
+        "</body></html>"
+    )
+
+
+def make_malformed_cnews_article_html(index: int = 0) -> str:
+    """
+    Статья с невалидной разметкой, как на реальных страницах: незакрытые
+    <p> и <div> внутри <p>. html.parser и lxml чинят такое по-разному,
+    поэтому сверка бэкендов без этих страниц ничего не доказывает.
+    """
+
+    rng = random.Random(index)
+    title, _ = story(index)
+
+    return (
+        f"<!DOCTYPE html><html><head><title>{title}</title></head><body>"
+        '<article class="news_container">'
+        f"<h1>{title}</h1>"
+        f"<p>{_sentence(rng)}<p>{_sentence(rng)}"
+        f"<p>{_sentence(rng)}<div>{_sentence(rng, 5)}</div>{_sentence(rng, 5)}</p>"
+        f"<p>{_sentence(rng)}</p>"
+        "</article>"
+        "</body></html>"
+    )
+
+
+def load_fixtures(fixtures_dir: str | None = None) -> dict[str, list[str]]:
+    """Страницы по видам: сохраненные из fixtures_dir или сгенерированные"""
+
+    fixtures: dict[str, list[str]] = {kind: [] for kind in FIXTURE_KINDS}
+
+    if fixtures_dir:
+        for kind in FIXTURE_KINDS:
+            for path in sorted(Path(fixtures_dir).glob(f"{kind}*.html")):
+                fixtures[kind].append(path.read_text(encoding="utf-8"))
+
+    if not fixtures["habr_list"]:
+        fixtures["habr_list"] = [make_habr_list_html(seed=seed) for seed in range(3)]
+    if not fixtures["cnews_list"]:
+        fixtures["cnews_list"] = [make_cnews_list_html(seed=seed) for seed in range(3)]
+    if not fixtures["cnews_article"]:
+        fixtures["cnews_article"] = [
+            make_cnews_article_html(index) for index in range(10)
+        ] + [make_malformed_cnews_article_html(index) for index in range(3)]
+
+    return fixtures
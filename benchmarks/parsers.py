@@ -0,0 +1,86 @@
+"""
+Бенчмарк бэкендов разбора html.
+
+Прогоняет фикстуры Habr/CNews через каждый бэкенд из
+app.news_parser.soup.HTML_BACKENDS, печатает pages/s и пиковую память,
+сверяет результат с эталонным html.parser без strainer.
+
+    python -m benchmarks.parsers [--fixtures DIR] [--repeat N]
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+
+from app.news_parser.cnews import parse_cnews_article_html, parse_cnews_list_entries
+from app.news_parser.habr import parser_habr_list_html
+from app.news_parser.soup import HTML_BACKENDS
+from benchmarks.fixtures import load_fixtures
+
+REFERENCE_BACKEND = "html.parser"
+
+PARSERS = {
+    "habr_list": parser_habr_list_html,
+    "cnews_list": parse_cnews_list_entries,
+    "cnews_article": parse_cnews_article_html,
+}
+
+
+def run_backend(parse, pages: list[str], backend: str, repeat: int) -> dict:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            parse(page, backend=backend)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    for page in pages:
+        parse(page, backend=backend)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "pages_per_s": len(pages) * repeat / elapsed,
+        "peak_kib": peak / 1024,
+        "output": [parse(page, backend=backend) for page in pages],
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--fixtures", help="каталог с сохраненными страницами")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args(argv)
+
+    backends = list(HTML_BACKENDS)
+    fixtures = load_fixtures(args.fixtures)
+    mismatches = 0
+
+    print(f"{'page':<14} {'backend':<22} {'pages/s':>10} {'peak KiB':>10}  same")
+    for kind, parse in PARSERS.items():
+        pages = fixtures[kind]
+        reference = None
+
+        for backend in [REFERENCE_BACKEND] + [
+            name for name in backends if name != REFERENCE_BACKEND
+        ]:
+            result = run_backend(parse, pages, backend, args.repeat)
+            if reference is None:
+                reference = result["output"]
+
+            same = result["output"] == reference
+            mismatches += not same
+            print(
+                f"{kind:<14} {backend:<22} {result['pages_per_s']:>10.1f} "
+                f"{result['peak_kib']:>10.0f}  {'yes' if same else 'NO'}"
+            )
+
+    if mismatches:
+        print(f"{mismatches} backend(s) returned results different from reference")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
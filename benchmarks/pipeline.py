@@ -0,0 +1,250 @@
+"""
+Офлайн-бенчмарк всего конвейера:
+collect_from_all_source → save_news_items → fill_post_queue → make_post_service.
+
+Вместо интернета — локальный HTTP-сервер с фикстурами Habr/CNews,
+вместо Gemini — FakeBackend с задержкой, вместо Telegram — локальный
+приемник, вместо MiniLM — хэширующий эмбеддер (или настоящая модель
+с --real-model). База — временный SQLite.
+
+    python -m benchmarks.pipeline [--rounds N] [--items N] [--http-latency S]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+EMBEDDING_DIM = 384
+
+
+class HashingModel:
+    """Стенд-ин для SentenceTransformer: bag-of-words в хэш-пространстве"""
+
+    def encode(self, texts, normalize_embeddings=False, convert_to_numpy=True):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        vectors = np.zeros((len(texts), EMBEDDING_DIM), dtype=np.float32)
+
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, zlib.crc32(word.encode()) % EMBEDDING_DIM] += 1.0
+
+        if normalize_embeddings:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors /= np.maximum(norms, 1e-12)
+        return vectors[0] if single else vectors
+
+
+class FakePublisher:
+    """Приемник вместо Telegram: считает сообщения, имитирует задержку"""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.sent: list[str] = []
+
+    async def send_many(self, messages, channel_ids):
+        await asyncio.sleep(self.latency)
+        self.sent.extend(messages)
+        return [None] * (len(messages) * max(1, len(channel_ids)))
+
+
+class FixtureServer:
+    """
+    HTTP-сервер, отдающий фикстуры; каждый раунд — новые новости.
+    Страница N ленты — новости на N-1 раундов старше, как в пагинации
+    настоящих лент.
+    """
+
+    def __init__(self, items: int, latency: float) -> None:
+        self.items = items
+        self.latency = latency
+        self.round = 0
+        self.requests = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        from benchmarks.fixtures import (
+            make_cnews_article_html,
+            make_cnews_list_html,
+            make_habr_list_html,
+        )
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+
+                page = re.search(r"/page_?(\d+)/?$", self.path)
+                offset = server.round - (int(page.group(1)) - 1 if page else 0)
+                count = server.items if offset >= 0 else 0
+                offset = max(offset, 0) * server.items
+
+                if self.path.startswith("/habr/news"):
+                    body = make_habr_list_html(count, offset=offset)
+                elif self.path.startswith("/cnews/news/top/"):
+                    index = int(self.path.rsplit("_", 1)[-1])
+                    body = make_cnews_article_html(index)
+                elif self.path.startswith("/cnews/news"):
+                    body = make_cnews_list_html(
+                        count,
+                        base_url=f"{server.base_url}/cnews",
+                        offset=offset,
+                    )
+                else:
+                    self.send_error(404)
+                    return
+
+                payload = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def configure_environment(args, workdir: str) -> None:
+    """Настройки должны быть заданы до первого импорта app.*"""
+
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{workdir}/bench.db")
+    os.environ.setdefault("HTTP_CACHE_DIR", f"{workdir}/http_cache")
+    os.environ.setdefault("VECTOR_INDEX_DIR", f"{workdir}/vectors")
+    os.environ["REWRITE_BACKEND"] = "fake"
+    os.environ["REWRITE_FAKE_LATENCY"] = str(args.llm_latency)
+    os.environ["POST_QUEUE_DEPTH"] = str(args.queue_depth)
+    os.environ["POST_MAX_AGE_HOURS"] = str(10 ** 6)
+    os.environ["TELEGRAM_CHANNEL_ID"] = "-1001"
+    if args.redis_url:
+        os.environ["REDIS_URL"] = args.redis_url
+    else:
+        os.environ["REDIS_URL"] = "redis://127.0.0.1:1/0"
+        os.environ["EMBEDDING_CACHE_SHARED_SIZE"] = "0"
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q) - 1]
+
+
+def timed(stats, stage: str, func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    stats[stage].append(time.perf_counter() - started)
+    return result
+
+
+def main(argv: list[str] | None = None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--rounds", type=int, default=5)
+    arg_parser.add_argument("--items", type=int, default=20, help="новостей на источник за раунд")
+    arg_parser.add_argument("--http-latency", type=float, default=0.05)
+    arg_parser.add_argument("--llm-latency", type=float, default=0.2)
+    arg_parser.add_argument("--telegram-latency", type=float, default=0.05)
+    arg_parser.add_argument("--queue-depth", type=int, default=3)
+    arg_parser.add_argument("--redis-url", help="по умолчанию Redis не используется")
+    arg_parser.add_argument("--real-model", action="store_true", help="настоящий MiniLM")
+    arg_parser.add_argument("--log-level", default="ERROR")
+    args = arg_parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level)
+
+    workdir = tempfile.mkdtemp(prefix="newsbot-bench-")
+    configure_environment(args, workdir)
+
+    from app.database import init_db
+    from app.news_parser import cnews, collect_from_all_source, habr, save_news_items
+    from app.news_parser import utils
+    from app.post_queue import fill_post_queue
+    from app.telegram import publisher
+
+    init_db()
+    if not args.real_model:
+        utils._model = HashingModel()
+    sink = FakePublisher(args.telegram_latency)
+    publisher._publisher = sink
+
+    stats: dict[str, list[float]] = defaultdict(list)
+    items: dict[str, int] = defaultdict(int)
+    loop = asyncio.new_event_loop()
+
+    with FixtureServer(args.items, args.http_latency) as server:
+        habr.HABR_NEWS_URL = f"{server.base_url}/habr/news/"
+        habr.HABR_NEWS_PAGE_URL = f"{server.base_url}/habr/news/page{{page}}/"
+        cnews.CNEWS_NEWS_URL = f"{server.base_url}/cnews/news"
+        cnews.CNEWS_NEWS_PAGE_URL = f"{server.base_url}/cnews/news/page_{{page}}"
+
+        for server.round in range(args.rounds):
+            news_items = timed(stats, "collect", collect_from_all_source, True)
+            items["collect"] += len(news_items)
+
+            items["save"] += timed(stats, "save", save_news_items, news_items)
+            items["rewrite"] += timed(stats, "rewrite", fill_post_queue)
+
+            while True:
+                sent = timed(
+                    stats,
+                    "post",
+                    loop.run_until_complete,
+                    publisher.make_post_service(),
+                )
+                if not sent:
+                    stats["post"].pop()
+                    break
+                items["post"] += 1
+
+        requests_made = server.requests
+
+    loop.close()
+
+    print(f"rounds={args.rounds} items/source/round={args.items} http_requests={requests_made}")
+    print(f"{'stage':<10} {'calls':>6} {'items':>7} {'items/s':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for stage in ("collect", "save", "rewrite", "post"):
+        durations = stats[stage]
+        total = sum(durations)
+        print(
+            f"{stage:<10} {len(durations):>6} {items[stage]:>7} "
+            f"{items[stage] / total if total else 0:>9.1f} "
+            f"{percentile(durations, 50) * 1000:>9.1f} "
+            f"{percentile(durations, 95) * 1000:>9.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
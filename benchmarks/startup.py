@@ -0,0 +1,93 @@
+"""
+Бенчмарк времени старта процессов.
+
+Каждый модуль импортируется в чистом интерпретаторе; проверяется,
+что время импорта меньше порога и что тяжелые библиотеки (torch,
+sentence-transformers, google-genai, PIL, telethon) не загружаются
+при старте API, beat и воркеров. Код возврата 1 — при нарушении.
+
+    python -m benchmarks.startup [--threshold 1.0] [--runs 3]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ENTRYPOINTS = (
+    "main",
+    "app.api",
+    "app.celery_app",
+    "app.tasks",
+)
+
+HEAVY_MODULES = (
+    "torch",
+    "transformers",
+    "sentence_transformers",
+    "sklearn",
+    "onnxruntime",
+    "google.genai",
+    "PIL",
+    "telethon",
+)
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"elapsed": elapsed, "heavy": heavy}}))
+"""
+
+
+def probe(module: str) -> dict:
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=project_root)
+
+    # main пишет app.log в текущий каталог — запускаем во временном
+    with tempfile.TemporaryDirectory() as workdir:
+        completed = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=workdir,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv: list[str] | None = None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--threshold", type=float, default=1.0, help="секунды")
+    arg_parser.add_argument("--runs", type=int, default=3)
+    args = arg_parser.parse_args(argv)
+
+    failed = False
+    print(f"{'module':<16} {'median s':>9} {'max s':>7}  heavy imports")
+
+    for module in ENTRYPOINTS:
+        results = [probe(module) for _ in range(args.runs)]
+        timings = [result["elapsed"] for result in results]
+        heavy = sorted({name for result in results for name in result["heavy"]})
+        median = statistics.median(timings)
+
+        failed |= median > args.threshold or bool(heavy)
+        print(
+            f"{module:<16} {median:>9.3f} {max(timings):>7.3f}  "
+            f"{', '.join(heavy) or '-'}"
+        )
+
+    if failed:
+        print(f"Startup guard failed: threshold {args.threshold}s or heavy imports")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,8 @@
 import uvicorn
 from fastapi import FastAPI
 from app.api import router
-from app.database import Base, engine
+from app.database import init_db
+from app.news_parser.vector_index import get_vector_index
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 from logging.handlers import RotatingFileHandler
@@ -36,7 +37,9 @@ app.add_middleware(
 
 @app.on_event("startup")
 def on_startup():
-    Base.metadata.create_all(bind=engine)
+    init_db()
+    # IVF для семантического поиска строится заранее, а не в первом запросе
+    get_vector_index().build_ann_in_background()
 
 
 @app.get("/")